@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+Bulk analysis tests.
+"""
+import io
+import json
+import sys
+
+import chess
+import pytest
+
+from whiterabbit.analyse import (
+    analyse,
+    check_workers,
+    completed_lines,
+    parse_position,
+    positions,
+)
+from whiterabbit.engine import CONTEXT
+
+FENS: list[str] = [
+    chess.STARTING_FEN,
+    "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1",
+    "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1",
+    "4k3/8/8/8/8/8/P7/4K2R b - - 0 1",
+]
+"""Positions analysed end to end."""
+
+
+def test_parse_position():
+    """
+    Test FEN and EPD lines are parsed.
+
+    EPD operations are returned with the position.
+    """
+    board, operations = parse_position(chess.STARTING_FEN)
+    assert board == chess.Board() and not operations
+    board, operations = parse_position(
+        'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - id "e4";'
+    )
+    assert board.fen() == chess.Board(
+        "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1"
+    ).fen()
+    assert operations == {"id": "e4"}
+    assert list(positions(io.StringIO("# header\n\n a \nb\n"))) == ["a", "b"]
+
+
+def test_completed_lines(tmp_path):
+    """
+    Test results of an interrupted run are counted.
+
+    Partial last line is removed.
+    """
+    path: str = str(tmp_path / "results.jsonl")
+    assert completed_lines(path) == 0
+    with open(path, "w", encoding="utf-8") as file:
+        file.write('{"a": 1}\n{"b": 2}\n{"c"')
+    assert completed_lines(path) == 2
+    with open(path, "r", encoding="utf-8") as file:
+        assert file.read() == '{"a": 1}\n{"b": 2}\n'
+
+
+def test_analyse(tmp_path, monkeypatch):
+    """
+    Test positions are analysed end to end by two search processes.
+
+    Results are written in input order, an invalid line gets an error
+    result, and a second run only analyses positions added since.
+    """
+    monkeypatch.setattr("whiterabbit.analyse.BATCH_SIZE", 1)
+    input_path: str = str(tmp_path / "positions.epd")
+    output_path: str = str(tmp_path / "results.jsonl")
+    with open(input_path, "w", encoding="utf-8") as file:
+        file.write("\n".join([*FENS[:2], "invalid", FENS[2]]) + "\n")
+    assert analyse(input_path, output_path, 1, 2) == 4
+    with open(input_path, "a", encoding="utf-8") as file:
+        file.write(FENS[3] + "\n")
+    assert analyse(input_path, output_path, 1, 2) == 1
+    with open(output_path, "r", encoding="utf-8") as file:
+        results: list[dict] = [json.loads(line) for line in file]
+    assert [result.get("fen") for result in results] == [
+        *FENS[:2],
+        None,
+        *FENS[2:],
+    ]
+    assert results[2]["input"] == "invalid" and "error" in results[2]
+    assert results[1]["bestmove"] == "d1d8"
+    assert all(result["depth"] == 1 for result in results if "fen" in result)
+
+
+def test_check_workers():
+    """Test a dead search process fails the analysis."""
+    process = CONTEXT.Process(target=sys.exit, args=[3])
+    process.start()
+    process.join()
+    with pytest.raises(RuntimeError, match="code 3"):
+        check_workers([process])
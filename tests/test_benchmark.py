@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+Speed tests for engine and training hot paths.
+
+Seeds are fixed so that every run times the same networks and games. Save a
+baseline with `--benchmark-save=baseline`, then compare against it with
+`--benchmark-compare --benchmark-compare-fail=min:25%`.
+"""
+import random
+
+import chess
+import numpy as np
+import pytest
+
+from whiterabbit.neural_network import NeuralNetwork
+from whiterabbit.trainer.config import DEPTHS, POSITIONS
+from whiterabbit.trainer.functions import (
+    func_core_play_game,
+    gen_direction_matrices,
+    gen_mutated_network,
+)
+from whiterabbit.trainer.profiling import Profiler
+
+SEED: int = 0
+"""Seed of random networks and moves."""
+FEN: str = (
+    "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"
+)
+"""Benchmarked position."""
+
+pytestmark = pytest.mark.filterwarnings("ignore::DeprecationWarning")
+"""Recording warnings would be timed too."""
+
+
+class TrainingSession:
+    """Minimal trainer state used by training functions."""
+
+    def __init__(self, network: NeuralNetwork) -> None:
+        """
+        Initialize session.
+
+        Games are played from the first training position only.
+
+        :param NeuralNetwork network: First network.
+        """
+        self.first_network: NeuralNetwork = network
+        """First network."""
+        self.direction_matrices: tuple = ({}, {})
+        """Mutation directions."""
+        self.positions: list[tuple[int, str]] = [(0, POSITIONS[0])]
+        """Starting positions indexes and FENs."""
+        self.scores: dict[int, int] = {}
+        """Networks scores."""
+        self.cli: TrainingSession = self
+        """Progress display, ignored."""
+        self.profiler: Profiler = Profiler(False)
+        """Disabled stages timings."""
+
+    generate_direction_matrices = gen_direction_matrices
+    generate_mutated_network = gen_mutated_network
+    core_play_game = func_core_play_game
+
+    def save_game(self, *args) -> None:
+        """Ignore finished games."""
+
+    record_game = save_game
+    game_iteration = save_game
+
+
+@pytest.fixture(name="network")
+def fixture_network() -> NeuralNetwork:
+    """
+    Seed random generators.
+
+    :return NeuralNetwork: Seeded random network.
+    """
+    random.seed(SEED)
+    np.random.seed(SEED)
+    return NeuralNetwork.random()
+
+
+@pytest.fixture(name="board")
+def fixture_board() -> chess.Board:
+    """
+    Get benchmarked position.
+
+    :return chess.Board: Position.
+    """
+    return chess.Board(FEN)
+
+
+def test_generate_inputs(benchmark, network, board):
+    """Test speed of input layer encoding."""
+    benchmark(network.generate_inputs, board)
+
+
+@pytest.mark.parametrize("depth", DEPTHS)
+def test_calculate(benchmark, network, board, depth):
+    """Test speed of hidden layers at each training depth."""
+    benchmark.group = "calculate"
+    benchmark(network.calculate, network.generate_inputs(board), depth)
+
+
+def test_output(benchmark, network, board):
+    """Test speed of output layer decoding."""
+    output_layer: np.ndarray = network.calculate(
+        network.generate_inputs(board), 1
+    )
+    benchmark(network.output, board, output_layer)
+
+
+@pytest.mark.parametrize("depth", DEPTHS)
+def test_search(benchmark, network, board, depth):
+    """Test speed of whole network search at each training depth."""
+    benchmark.group = "search"
+    benchmark(network.search, board, depth)
+
+
+def test_new_game_end(benchmark, network):
+    """Test speed of matrices saving and restoring between games."""
+
+    def new_game_end() -> None:
+        network.new_game()
+        network.game_end()
+
+    benchmark(new_game_end)
+
+
+def test_network_hash(benchmark, network):
+    """Test speed of network hash."""
+    benchmark(hash, network)
+
+
+def test_save(benchmark, network, tmp_path):
+    """Test speed of network save."""
+    benchmark(network.save, str(tmp_path / "network.npz"))
+
+
+def test_load(benchmark, network, tmp_path):
+    """Test speed of network load."""
+    network.save(str(tmp_path / "network.npz"))
+    benchmark(NeuralNetwork.load, str(tmp_path / "network.npz"))
+
+
+def test_gen_mutated_network(benchmark, network):
+    """Test speed of mutated network generation."""
+    session: TrainingSession = TrainingSession(network)
+    session.generate_direction_matrices()
+    benchmark(session.generate_mutated_network, 4)
+
+
+def test_core_play_game(benchmark, network):
+    """
+    Test speed of a whole training game.
+
+    Generators are reseeded before each game, so that each round plays the
+    same game.
+    """
+    session: TrainingSession = TrainingSession(network)
+    opponent: NeuralNetwork = NeuralNetwork.random()
+
+    def setup() -> None:
+        random.seed(SEED)
+        np.random.seed(SEED)
+
+    benchmark.pedantic(
+        session.core_play_game,
+        args=(network, opponent, 1),
+        setup=setup,
+        rounds=3,
+    )
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+Book and Syzygy moves tests.
+"""
+import collections
+import struct
+
+import chess
+import chess.polyglot
+import chess.syzygy
+
+from whiterabbit.book import MISSING, Book, ProbeCache
+
+RESULTS: dict[str, tuple[int, int]] = {
+    "h1h7": (-2, -12),
+    "h1h6": (-2, -4),
+    "a2a3": (-1, -30),
+}
+"""WDL and DTZ after each winning move, other moves draw."""
+
+
+def last_move(board: chess.Board) -> str:
+    """
+    Get the move played to reach a position.
+
+    :param chess.Board board: Position.
+    :return str: UCI of last move, empty if no move was played.
+    """
+    return board.peek().uci() if board.move_stack else ""
+
+
+class StubTablebase:
+    """Syzygy tables of KRPvK giving :data:`RESULTS`, counting probes."""
+
+    def __init__(self) -> None:
+        """Initialize tables."""
+        self.wdl: dict[str, str] = {"KRPvK": "KRPvK.rtbw"}
+        """Loaded WDL tables."""
+        self.probes: collections.Counter[str] = collections.Counter()
+        """Number of WDL probes of each position."""
+
+    def probe_wdl(self, board: chess.Board) -> int:
+        """
+        Probe WDL of a position.
+
+        :param chess.Board board: Position, after the move played.
+        :return int: WDL from side to move point of view.
+        """
+        self.probes[board.board_fen()] += 1
+        return RESULTS.get(last_move(board), (0, 0))[0]
+
+    def probe_dtz(self, board: chess.Board) -> int:
+        """
+        Probe DTZ of a position.
+
+        :param chess.Board board: Position, after the move played.
+        :return int: DTZ from side to move point of view.
+        """
+        return RESULTS.get(last_move(board), (0, 0))[1]
+
+
+def stub_book(tmp_path) -> Book:
+    """
+    Build a book with an empty book file and stub Syzygy tables.
+
+    :param pathlib.Path tmp_path: Directory of book files.
+    :return Book: Book.
+    """
+    (tmp_path / "book.bin").write_bytes(b"")
+    book: Book = Book(str(tmp_path), str(tmp_path / "book.bin"))
+    book.syzygy_tables = StubTablebase()  # type: ignore
+    book.syzygy_pieces = 4
+    return book
+
+
+def test_best_syzygy_move(tmp_path):
+    """
+    Test best Syzygy move ranking.
+
+    Quickest win is chosen, wins after the 50-move rule are draws and
+    zeroing moves are preferred then. Each child is probed once.
+    """
+    book: Book = stub_book(tmp_path)
+    board: chess.Board = chess.Board("4k3/8/8/8/8/8/P7/4K2R w - - 0 1")
+    assert book.best_syzygy_move(board) == chess.Move.from_uci("h1h6")
+    assert board.fen() == "4k3/8/8/8/8/8/P7/4K2R w - - 0 1"
+    probes: collections.Counter[str] = book.syzygy_tables.probes
+    assert len(probes) == board.legal_moves.count()
+    assert set(probes.values()) == {1}
+    board.halfmove_clock = 97
+    assert book.best_syzygy_move(board) == chess.Move.from_uci("a2a3")
+    assert set(probes.values()) == {1}  # Children are cached
+
+
+def test_probe_cache(tmp_path):
+    """
+    Test least recently used results are evicted.
+
+    Hits and misses are counted, and reported by book statistics.
+    """
+    cache: ProbeCache = ProbeCache(2)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get(1) == "a"
+    cache.put(3, "c")  # Evicts 2, used less recently than 1
+    assert cache.get(2) is MISSING
+    assert cache.get(1) == "a" and cache.get(3) == "c"
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert list(cache.results) == [1, 3]
+    book: Book = stub_book(tmp_path)
+    board: chess.Board = chess.Board("4k3/8/8/8/8/8/P7/4K2R b - - 0 1")
+    assert book.is_syzygy_position(board)
+    assert book.is_syzygy_position(board)
+    stats: dict[str, float] = book.stats()
+    assert (stats["syzygy_hits"], stats["syzygy_misses"]) == (1, 1)
+    assert stats["tbhits"] == 1
+
+
+def test_best_book_move(tmp_path):
+    """
+    Test book moves are drawn from legal entries, through cache.
+
+    Illegal entries are never drawn, whatever their weight, and legal ones
+    are drawn by weight.
+    """
+    key: int = chess.polyglot.zobrist_hash(chess.Board())
+    after: chess.Board = chess.Board()
+    after.push_uci("e2e4")
+    reply: int = chess.polyglot.zobrist_hash(after)
+    with open(tmp_path / "book.bin", "wb") as file:
+        for entry_key, raw_move, weight in sorted(
+            (
+                (key, chess.E2 << 6 | chess.E4, 1),
+                (key, chess.E2 << 6 | chess.E5, 1000),  # Illegal
+                (reply, chess.E7 << 6 | chess.E5, 3),
+                (reply, chess.C7 << 6 | chess.C5, 1),
+            )
+        ):
+            file.write(struct.pack(">QHHI", entry_key, raw_move, weight, 0))
+    book: Book = Book(str(tmp_path), str(tmp_path / "book.bin"))
+    assert book.is_book_position(chess.Board())
+    for _ in range(20):
+        assert book.best_book_move(chess.Board()) == chess.Move.from_uci(
+            "e2e4"
+        )
+    stats: dict[str, float] = book.stats()
+    assert (stats["book_hits"], stats["book_misses"]) == (20, 1)
+    draws: collections.Counter[str] = collections.Counter(
+        book.best_book_move(after).uci() for _ in range(400)
+    )
+    assert set(draws) == {"e7e5", "c7c5"}
+    assert draws["e7e5"] > 2 * draws["c7c5"]
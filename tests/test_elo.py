@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+Elo rating tests.
+"""
+import numpy as np
+
+from whiterabbit.elo import GameCache, fit_ratings, game_key, pairings
+
+
+def test_pairings():
+    """
+    Test round-robin and gauntlet matches.
+
+    Each pair of networks meets once.
+    """
+    assert list(pairings(3)) == [(0, 1), (0, 2), (1, 2)]
+    assert list(pairings(4, gauntlet=2)) == [(0, 2), (1, 2), (2, 3)]
+
+
+def test_fit_ratings():
+    """
+    Test ratings follow results.
+
+    Ratings average 0, the winner is rated higher and equal results give
+    equal ratings.
+    """
+    games: list[tuple[int, int, int]] = []
+    for _ in range(10):
+        games += [(0, 1, 1), (1, 0, -1), (1, 2, 0), (2, 1, 0)]
+    ratings, errors = fit_ratings(3, games)
+    assert abs(ratings.sum()) < 1e-6
+    assert ratings[0] > ratings[1]
+    assert np.isclose(ratings[1], ratings[2], atol=1e-3)
+    assert (errors > 0).all()
+    draws, _ = fit_ratings(2, [(0, 1, 0), (1, 0, 0)])
+    assert np.allclose(draws, 0, atol=1e-3)
+
+
+def test_game_cache(tmp_path):
+    """
+    Test finished games are found again.
+
+    An interrupted write is removed, so that next games are found too.
+    """
+    path: str = str(tmp_path / "elo" / "games.jsonl")
+    key = game_key("a", "b", "8/8/8/8/8/8/8/K6k w - - 0 1", 1)
+    GameCache(path).add(key, -1, 42)
+    with open(path, "a", encoding="utf-8") as file:
+        file.write('{"white": ')
+    cache: GameCache = GameCache(path)
+    assert cache.results == {key: -1}
+    other = game_key("b", "a", "8/8/8/8/8/8/8/K6k w - - 0 1", 1)
+    cache.add(other, 0, 10)
+    assert GameCache(path).results == {key: -1, other: 0}
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+UCI startup import tests.
+"""
+import subprocess
+import sys
+
+IMPORT_BUDGET: int = 1_000_000
+"""Maximum cumulative import time of UCI mode, in microseconds."""
+TRAINING_MODULES: tuple[str, ...] = (
+    "filelock",
+    "matplotlib",
+    "rich",
+    "textual",
+)
+"""Modules only needed for training."""
+
+
+def uci_import_times() -> dict[str, int]:
+    """
+    Import UCI mode in a fresh interpreter with ``-X importtime``.
+
+    :return dict[str, int]: Cumulative import time by module, in microseconds.
+    """
+    process: subprocess.CompletedProcess = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import whiterabbit.cli, whiterabbit.uci",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    times: dict[str, int] = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isnumeric():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_no_training_modules():
+    """
+    Test UCI mode doesn't import training dependencies.
+
+    See TRAINING_MODULES.
+    """
+    imported: set[str] = {
+        module.split(".")[0] for module in uci_import_times()
+    }
+    assert not imported.intersection(TRAINING_MODULES)
+
+
+def test_import_budget():
+    """
+    Test UCI mode import time.
+
+    Must be under IMPORT_BUDGET.
+    """
+    times: dict[str, int] = uci_import_times()
+    assert times["whiterabbit.cli"] + times["whiterabbit.uci"] < IMPORT_BUDGET
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+Compiled polyglot book tests.
+"""
+import collections
+import os
+import random
+import struct
+
+import chess
+import chess.polyglot
+import numpy as np
+
+from whiterabbit.polyglot import BookIndex
+
+
+def write_book(path: str) -> None:
+    """
+    Write a small polyglot book of random openings.
+
+    Includes a castling move, stored as king takes rook.
+
+    :param str path: Book path.
+    """
+    generator: random.Random = random.Random(0)
+    entries: list[tuple[int, int, int, int]] = []
+    for _ in range(100):
+        board: chess.Board = chess.Board()
+        for _ in range(6):
+            move: chess.Move = generator.choice(list(board.legal_moves)[:5])
+            entries.append(
+                (
+                    chess.polyglot.zobrist_hash(board),
+                    move.to_square | move.from_square << 6,
+                    generator.randint(0, 5),
+                    0,
+                )
+            )
+            board.push(move)
+    board = chess.Board("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+    entries.append(
+        (chess.polyglot.zobrist_hash(board), chess.H1 | chess.E1 << 6, 1, 0)
+    )
+    with open(path, "wb") as file:
+        for entry in sorted(entries):
+            file.write(struct.pack(">QHHI", *entry))
+
+
+def test_entries(tmp_path):
+    """
+    Test index entries match python-chess reader ones.
+
+    Index must be saved and reloaded unchanged.
+    """
+    path: str = str(tmp_path / "book.bin")
+    write_book(path)
+    compiled: BookIndex = BookIndex.open(path)
+    index: BookIndex = BookIndex.open(path)  # saved index
+    assert np.array_equal(compiled.keys, index.keys)
+    boards: list[chess.Board] = [
+        chess.Board(),
+        chess.Board("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1"),
+    ]
+    for move in chess.Board().legal_moves:
+        boards.append(chess.Board())
+        boards[-1].push(move)
+    with chess.polyglot.open_reader(path) as reader:
+        for board in boards:
+            expected: collections.Counter = collections.Counter()
+            for entry in reader.find_all(board):
+                expected[entry.move] += entry.weight
+            found: collections.Counter = collections.Counter()
+            for move, weight in index.entries(board):
+                found[move] += weight
+            assert found == expected
+    assert index.entries(boards[1]) == [(chess.Move.from_uci("e1g1"), 1)]
+
+
+def test_choose(tmp_path):
+    """
+    Test vectorised draws follow entries weights.
+
+    Positions not in book draw move 0.
+    """
+    path: str = str(tmp_path / "book.bin")
+    write_book(path)
+    index: BookIndex = BookIndex.open(path)
+    board: chess.Board = chess.Board()
+    key: int = chess.polyglot.zobrist_hash(board)
+    draws: np.ndarray = index.choose(
+        np.array([key] * 10000 + [1], dtype=np.uint64),
+        np.random.default_rng(0),
+    )
+    assert draws[-1] == 0
+    weights: collections.Counter = collections.Counter()
+    for move, weight in index.entries(board):
+        weights[move.to_square | move.from_square << 6] += weight
+    total: int = sum(weights.values())
+    counts: collections.Counter = collections.Counter(draws[:-1].tolist())
+    assert set(counts) <= set(weights)
+    for raw_move, weight in weights.items():
+        assert abs(counts[raw_move] / 10000 - weight / total) < 0.02
+
+
+def test_choose_empty(tmp_path):
+    """
+    Test draws from an empty book.
+
+    All positions draw move 0, and the index is saved atomically.
+    """
+    path: str = str(tmp_path / "book.bin")
+    (tmp_path / "book.bin").write_bytes(b"")
+    index: BookIndex = BookIndex.open(path)
+    assert len(index) == 0
+    draws: np.ndarray = index.choose(
+        np.array([1, 2], dtype=np.uint64), np.random.default_rng(0)
+    )
+    assert draws.tolist() == [0, 0]
+    assert sorted(os.listdir(tmp_path)) == ["book.bin", "book.bin.index.npz"]
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+Training positions tests.
+"""
+import random
+
+import chess
+import numpy as np
+
+from whiterabbit.trainer.config import POSITIONS
+from whiterabbit.trainer.positions import (
+    PositionPool,
+    pack_position,
+    parse_material,
+    unpack_position,
+)
+
+
+def test_pack_position():
+    """
+    Test packed positions are unpacked unchanged.
+
+    Random games cover castling rights, en passant and promotions.
+    """
+    generator: random.Random = random.Random(0)
+    for _ in range(10):
+        board: chess.Board = chess.Board()
+        while not board.is_game_over():
+            board.push(generator.choice(list(board.legal_moves)))
+            unpacked: chess.Board = unpack_position(pack_position(board))
+            assert unpacked.board_fen() == board.board_fen()
+            assert unpacked.turn == board.turn
+            assert unpacked.castling_rights == board.castling_rights
+            assert unpacked.ep_square == board.ep_square
+
+
+def test_pool(tmp_path):
+    """
+    Test pool sampling.
+
+    Samples always hold the requested number of positions.
+    """
+    path: str = str(tmp_path / "positions.npy")
+    default: list[tuple[int, str]] = PositionPool(path).sample(
+        7, np.random.default_rng(0)
+    )
+    assert [fen for _, fen in default] == (POSITIONS + POSITIONS)[:7]
+    boards: list[chess.Board] = [chess.Board(fen) for fen in POSITIONS[:3]]
+    PositionPool.save(path, boards)
+    pool: PositionPool = PositionPool(path)
+    assert len(pool) == 3
+    sample: list[tuple[int, str]] = pool.sample(
+        5, np.random.default_rng(0)
+    )
+    assert len(sample) == 5
+    for index, fen in sample:
+        assert fen == boards[index].fen()
+    assert parse_material("KRRvK") == (
+        [chess.KING, chess.ROOK, chess.ROOK],
+        [chess.KING],
+    )
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+Engine search tests.
+"""
+import chess
+
+from whiterabbit.engine import Engine
+from whiterabbit.engine.evaluation import Evaluation
+from whiterabbit.engine.limits import Limits, TimeManager
+
+engine: Engine = Engine()
+
+
+def test_mate_in_one():
+    """
+    Test search finds a back rank mate.
+
+    Score must be reported as mate in 1.
+    """
+    evaluation: Evaluation = engine.search(
+        chess.Board("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"), Limits(depth=3)
+    )
+    assert evaluation.best_moves == [chess.Move.from_uci("a1a8")]
+    assert evaluation.score[1] == 1
+
+
+def test_mate_in_one_depth_one():
+    """
+    Test quiescence finds mates.
+
+    At depth 1, the mated side is searched by quiescence only.
+    """
+    evaluation: Evaluation = engine.search(
+        chess.Board("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1"), Limits(depth=1)
+    )
+    assert evaluation.best_moves == [chess.Move.from_uci("d1d8")]
+    assert evaluation.score[1] == 1
+
+
+def test_depth_infos():
+    """
+    Test search reports each completed depth.
+
+    Nodes must be counted.
+    """
+    infos: list[Evaluation] = []
+    engine.search(chess.Board(), Limits(depth=3), info=infos.append)
+    assert [info.depth for info in infos] == [1, 2, 3]
+    assert all(info.nodes > 0 for info in infos)
+
+
+def test_no_legal_moves():
+    """
+    Test search in a checkmated position.
+
+    No best move must be returned.
+    """
+    evaluation: Evaluation = engine.search(
+        chess.Board("R5k1/5ppp/8/8/8/8/8/6K1 b - - 0 1"), Limits(depth=2)
+    )
+    assert not evaluation.best_moves
+
+
+def test_node_limit():
+    """
+    Test search stops on node limit.
+
+    A best move must still be returned.
+    """
+    evaluation: Evaluation = engine.search(chess.Board(), Limits(nodes=200))
+    assert evaluation.nodes <= 200
+    assert evaluation.best_moves
+
+
+def test_clock_deadlines():
+    """
+    Test deadlines fit in the clock.
+
+    Soft deadline must come before hard one.
+    """
+    for movestogo in (None, 1, 10):
+        time_manager: TimeManager = TimeManager(
+            Limits(wtime=10000, btime=10000, winc=100, movestogo=movestogo),
+            chess.Board(),
+        )
+        assert time_manager.soft is not None
+        assert time_manager.hard is not None
+        assert 0 < time_manager.soft <= time_manager.hard < 10000
+
+
+def test_searchmoves():
+    """
+    Test search only plays allowed root moves.
+
+    Position must not be modified.
+    """
+    board: chess.Board = chess.Board()
+    allowed: list[chess.Move] = [
+        chess.Move.from_uci("a2a3"),
+        chess.Move.from_uci("h2h3"),
+    ]
+    evaluation: Evaluation = engine.search(
+        board, Limits(depth=2, searchmoves=allowed)
+    )
+    assert evaluation.best_moves[0] in allowed
+    assert board == chess.Board()
+
+
+def test_multipv():
+    """
+    Test MultiPV search returns distinct lines.
+
+    Lines must be sorted by score, and count their own nodes only.
+    """
+    evaluation: Evaluation = engine.search(
+        chess.Board("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"),
+        Limits(depth=3, multipv=3),
+    )
+    assert len(evaluation.lines) == 3
+    assert len(set(evaluation.best_moves)) == 3
+    assert evaluation.lines[0].score[1] == 1
+    scores: list[int] = [line.score[0] for line in evaluation.lines]
+    assert scores == sorted(scores, reverse=True)
+    assert all(line.nodes > 0 for line in evaluation.lines)
+    assert sum(line.nodes for line in evaluation.lines) <= evaluation.nodes
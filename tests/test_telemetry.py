@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+UCI telemetry tests.
+"""
+from whiterabbit.uci.telemetry import LATENCY_BUCKETS, Telemetry
+
+
+def test_histogram():
+    """
+    Test latencies are counted in their bucket.
+
+    Only the last searches of the window are kept.
+    """
+    telemetry: Telemetry = Telemetry(window=3)
+    for latency in (5, 20, 20000, 30):
+        telemetry.latencies.append(latency)
+    counts: list[int] = telemetry.histogram()
+    assert len(counts) == len(LATENCY_BUCKETS) + 1
+    assert sum(counts) == 3
+    assert counts[1] == counts[2] == counts[-1] == 1
+
+
+def test_counters():
+    """
+    Test search counters.
+
+    Best moves received without a running search are ignored.
+    """
+    telemetry: Telemetry = Telemetry()
+    telemetry.bestmove(100)
+    assert telemetry.searches == 0
+    telemetry.search_start()
+    telemetry.bestmove(100)
+    telemetry.search_start()
+    telemetry.bestmove(50)
+    assert telemetry.searches == 2
+    assert telemetry.total_nodes == 150
+    assert telemetry.nodes == 50
+    assert len(telemetry.report()) == 4
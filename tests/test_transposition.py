@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+Transposition table tests.
+"""
+import random
+
+import chess
+import chess.polyglot
+
+from whiterabbit.engine.transposition import (
+    EXACT,
+    LOWER,
+    TranspositionTable,
+    pack_move,
+    unpack_move,
+)
+from whiterabbit.engine.zobrist import push, zobrist_key
+
+
+def test_incremental_keys():
+    """
+    Test incremental keys match polyglot keys.
+
+    Random games cover castling, en passant and promotions.
+    """
+    generator: random.Random = random.Random(0)
+    for _ in range(20):
+        board: chess.Board = chess.Board()
+        key: int = zobrist_key(board)
+        while not board.is_game_over():
+            move: chess.Move = generator.choice(list(board.legal_moves))
+            key = push(board, move, key)
+            assert key == chess.polyglot.zobrist_hash(board)
+
+
+def test_store_probe():
+    """
+    Test stored entries are found back.
+
+    Moves must be packed and unpacked unchanged.
+    """
+    table: TranspositionTable = TranspositionTable(1)
+    move: chess.Move = chess.Move.from_uci("e7e8q")
+    table.store(1234, pack_move(move), -150, 5, EXACT)
+    entry = table.probe(1234)
+    assert entry is not None
+    assert unpack_move(entry[0]) == move
+    assert entry[1:] == (-150, 5, EXACT)
+    assert table.probe(4321) is None
+
+
+def test_replacement():
+    """
+    Test shallow entries don't replace deeper ones.
+
+    They go to the always-replace slot instead.
+    """
+    table: TranspositionTable = TranspositionTable(1)
+    buckets: int = len(table.table)
+    table.store(1, 0, 10, 8, LOWER)
+    table.store(1 + buckets, 0, 20, 2, LOWER)
+    table.store(1 + 2 * buckets, 0, 30, 1, LOWER)
+    assert table.probe(1) is not None
+    assert table.probe(1 + buckets) is None
+    assert table.probe(1 + 2 * buckets) is not None
+    assert table.hashfull() > 0
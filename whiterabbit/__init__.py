@@ -7,8 +7,6 @@ Main functions.
 """
 import os
 
-from .neural_network.training import Trainer
-
 __version__: str = "0.1.4"
 
 
@@ -18,6 +16,11 @@ def train_start(config: bool = False) -> None:
 
     :param bool config: Wether to reset config or not.
     """
+    # Imported here so that UCI startup doesn't load training dependencies
+    from .neural_network.training import (  # pylint: disable=C0415
+        Trainer,
+    )
+
     trainer: Trainer = Trainer()
     if config:
         trainer.prompt_conf()
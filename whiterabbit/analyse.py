@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+Bulk analysis of EPD and FEN files.
+
+Positions flow through a bounded pipeline: the reader sends batches of
+lines to search processes, and a writer thread writes results in input
+order. At most :data:`WINDOW` batches per process are read but not written
+yet, so memory doesn't depend on input size. Blocking waits poll search
+processes, so that a dead process fails the analysis instead of hanging it.
+"""
+import json
+import os
+import queue
+import threading
+from multiprocessing.queues import Queue
+from typing import Any, Callable, Iterator, Optional, TextIO
+
+import chess
+
+from .engine import CONTEXT
+from .engine.evaluation import Evaluation
+from .engine.limits import Limits
+
+BATCH_SIZE: int = 16
+"""Positions sent to a search process at once."""
+WINDOW: int = 4
+"""Batches per search process read ahead of the writer."""
+POLL_TIMEOUT: float = 1.0
+"""Seconds between search processes checks while waiting."""
+
+
+def positions(file: TextIO) -> Iterator[str]:
+    """
+    Read positions of an EPD or FEN file.
+
+    Blank lines and comments starting with # are skipped.
+
+    :param TextIO file: Input file.
+    :return Iterator[str]: Position lines.
+    """
+    for line in file:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def parse_position(line: str) -> tuple[chess.Board, dict[str, Any]]:
+    """
+    Parse a FEN or an EPD line.
+
+    :param str line: FEN, or EPD with operations.
+    :return tuple[chess.Board, dict[str, Any]]: Position and EPD operations.
+    :raises ValueError: If the line is neither a FEN nor an EPD.
+    """
+    try:
+        return chess.Board(line), {}
+    except ValueError:
+        board: chess.Board = chess.Board()
+        operations: dict[str, Any] = board.set_epd(line)
+        return board, operations
+
+
+def analyse_position(engine: Any, line: str, depth: int) -> dict[str, Any]:
+    """
+    Analyse a position.
+
+    Each position is searched in a new game, so that results don't depend
+    on previous positions.
+
+    :param engine.Engine engine: Search engine.
+    :param str line: FEN or EPD line.
+    :param int depth: Search depth.
+    :return dict[str, Any]: Result, with an error message if the line is
+        invalid.
+    """
+    try:
+        board, operations = parse_position(line)
+    except ValueError as exception:
+        return {"input": line, "error": str(exception)}
+    engine.new_game()
+    evaluation: Evaluation = engine.search(board, Limits(depth=depth))
+    result: dict[str, Any] = {"fen": board.fen()}
+    if "id" in operations:
+        result["id"] = operations["id"]
+    result.update(
+        {
+            "bestmove": (
+                evaluation.best_moves[0].uci()
+                if evaluation.best_moves
+                else None
+            ),
+            "pv": [move.uci() for move in evaluation.pv],
+            "score": (
+                {"mate": evaluation.score[1]}
+                if evaluation.score[1]
+                else {"cp": evaluation.score[0]}
+            ),
+            "depth": evaluation.depth,
+            "nodes": evaluation.nodes,
+            "time": evaluation.time,
+        }
+    )
+    return result
+
+
+def analyse_worker(tasks: Queue, results: Queue, depth: int) -> None:
+    """
+    Search process main loop.
+
+    Receives (index, lines) batches until None, and sends back
+    (index, results) batches. A position failing to be analysed gets an
+    error result, other positions of its batch are still analysed.
+
+    :param Queue tasks: Batches to analyse.
+    :param Queue results: Analysed batches.
+    :param int depth: Search depth.
+    """
+    # Imported here so that only search processes load the network
+    from . import engine  # pylint: disable=C0415
+
+    search_engine: engine.Engine = engine.Engine()
+    while True:
+        task: Optional[tuple[int, list[str]]] = tasks.get()
+        if task is None:
+            break
+        index, lines = task
+        batch: list[dict[str, Any]] = []
+        for line in lines:
+            try:
+                batch.append(analyse_position(search_engine, line, depth))
+            except Exception as exception:  # pylint: disable=W0718
+                batch.append({"input": line, "error": repr(exception)})
+        results.put((index, batch))
+
+
+def check_workers(processes: list) -> None:
+    """
+    Check search processes are still running.
+
+    :param list processes: Search processes.
+    :raises RuntimeError: If a search process exited.
+    """
+    for process in processes:
+        if process.exitcode is not None:
+            raise RuntimeError(
+                f"Search process {process.pid} exited with code "
+                + f"{process.exitcode}"
+            )
+
+
+def completed_lines(path: str) -> int:
+    """
+    Count results already written by an interrupted run.
+
+    A partial last line is removed.
+
+    :param str path: Output path.
+    :return int: Number of complete lines.
+    """
+    if not os.path.exists(path):
+        return 0
+    count: int = 0
+    end: int = 0  # Offset after last complete line
+    with open(path, "rb") as file:
+        for line in file:
+            if not line.endswith(b"\n"):
+                break
+            count += 1
+            end += len(line)
+    if end != os.path.getsize(path):
+        with open(path, "rb+") as file:
+            file.truncate(end)
+    return count
+
+
+def write_results(
+    results: Queue,
+    file: TextIO,
+    slots: threading.Semaphore,
+    progress: Callable[[int], None],
+    stop: threading.Event,
+) -> None:
+    """
+    Writer thread main loop.
+
+    Batches arriving out of order wait in a reorder buffer. Each written
+    batch frees a slot for the reader. Stops on (-1, number of batches),
+    or when the reader failed.
+
+    :param Queue results: Analysed batches, and end message.
+    :param TextIO file: Output file.
+    :param threading.Semaphore slots: Released once per written batch.
+    :param Callable[[int], None] progress: Called with number of results
+        written by each batch.
+    :param threading.Event stop: Set by the reader when it failed.
+    """
+    pending: dict[int, list[dict[str, Any]]] = {}
+    written: int = 0
+    total: Optional[int] = None
+    while (total is None or written < total) and not stop.is_set():
+        try:
+            index, batch = results.get(timeout=POLL_TIMEOUT)
+        except queue.Empty:
+            continue
+        if index < 0:
+            total = batch
+            continue
+        pending[index] = batch
+        while written in pending:
+            lines: list[dict[str, Any]] = pending.pop(written)
+            file.write("".join(json.dumps(line) + "\n" for line in lines))
+            file.flush()
+            written += 1
+            slots.release()
+            progress(len(lines))
+
+
+def analyse(
+    input_path: str,
+    output_path: str,
+    depth: int,
+    workers: int,
+    progress: Callable[[int], None] = lambda count: None,
+) -> int:
+    """
+    Analyse positions of a file.
+
+    Results are written as JSON lines, in input order. Positions whose
+    result is already in output are skipped, so an interrupted run resumes
+    where it stopped.
+
+    :param str input_path: EPD or FEN file, one position per line.
+    :param str output_path: JSON lines file.
+    :param int depth: Search depth.
+    :param int workers: Number of search processes.
+    :param Callable[[int], None] progress: Called with number of results
+        written by each batch.
+    :return int: Number of positions analysed by this run.
+    :raises RuntimeError: If a search process died.
+    """
+    skipped: int = completed_lines(output_path)
+    tasks: Queue = CONTEXT.Queue(maxsize=2 * workers)
+    results: Queue = CONTEXT.Queue()
+    processes: list = [
+        CONTEXT.Process(
+            target=analyse_worker,
+            args=[tasks, results, depth],
+            daemon=True,
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    slots: threading.Semaphore = threading.Semaphore(WINDOW * workers)
+    stop: threading.Event = threading.Event()
+    count: int = 0
+
+    def send(task: tuple[int, list[str]]) -> None:
+        while not slots.acquire(timeout=POLL_TIMEOUT):
+            check_workers(processes)
+        while True:
+            try:
+                tasks.put(task, timeout=POLL_TIMEOUT)
+                return
+            except queue.Full:
+                check_workers(processes)
+
+    try:
+        with open(input_path, "r", encoding="utf-8") as input_file, open(
+            output_path, "a", encoding="utf-8"
+        ) as output_file:
+            writer: threading.Thread = threading.Thread(
+                target=write_results,
+                args=[results, output_file, slots, progress, stop],
+                name="analyse-writer",
+                daemon=True,
+            )
+            writer.start()
+            try:
+                batches: int = 0
+                batch: list[str] = []
+                for index, line in enumerate(positions(input_file)):
+                    if index < skipped:
+                        continue
+                    batch.append(line)
+                    count += 1
+                    if len(batch) == BATCH_SIZE:
+                        send((batches, batch))
+                        batches += 1
+                        batch = []
+                if batch:
+                    send((batches, batch))
+                    batches += 1
+                results.put((-1, batches))
+                while writer.is_alive():
+                    writer.join(POLL_TIMEOUT)
+                    check_workers(processes)
+            finally:
+                stop.set()  # Writer must not outlive output file
+                writer.join()
+        for process in processes:
+            tasks.put(None)
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():  # Interrupted
+                process.terminate()
+    return count
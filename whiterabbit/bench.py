@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+Engine speed benchmark.
+"""
+import time
+from typing import Callable
+
+from .engine.limits import Limits
+from .uci.engine import Engine
+
+BENCH_DEPTH: int = 4
+"""Default search depth."""
+BENCH_THREADS: int = 1
+"""Default number of search processes."""
+BENCH_HASH: int = 32
+"""Default transposition table size, in megabytes."""
+BENCH_POSITIONS: list[str] = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "r2q1rk1/pP1p2pp/Q4n2/bbp1p3/Np6/1B3NBn/pPPP1PPP/R3K2R b KQ - 0 1",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4",
+    "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1",
+    "8/8/8/4k3/8/8/4P3/4K3 w - - 0 1",
+    "8/5K1k/8/8/8/8/8/R7 w - - 0 1",
+]
+"""Searched positions, covering openings, middlegames and endgames."""
+
+
+def bench(
+    depth: int = BENCH_DEPTH,
+    threads: int = BENCH_THREADS,
+    hash_size: int = BENCH_HASH,
+    output: Callable[[str], None] = print,
+) -> tuple[int, int]:
+    """
+    Search benchmark positions.
+
+    Each position is searched in a new game, so that with one thread the
+    number of nodes only depends on the engine code and network: it is the
+    build signature.
+
+    :param int depth: Search depth.
+    :param int threads: Number of search processes.
+    :param int hash_size: Transposition table size, in megabytes.
+    :param Callable[[str], None] output: Called with each result line.
+    :return tuple[int, int]: Total nodes and time in milliseconds.
+    """
+    engine: Engine = Engine()
+    engine.set_option("Threads", str(threads))
+    engine.set_option("Hash", str(hash_size))
+    total_nodes: int = 0
+    total_time: float = 0.0
+    try:
+        engine.start()
+        for index, fen in enumerate(BENCH_POSITIONS):
+            engine.new_game()
+            engine.set_position(fen, [])
+            start: float = time.perf_counter()
+            engine.search(Limits(depth=depth))
+            engine.done.wait()
+            elapsed: float = time.perf_counter() - start
+            nodes: int = sum(
+                result.nodes for result in engine.results.values()
+            )
+            total_nodes += nodes
+            total_time += elapsed
+            output(
+                f"Position {index + 1}/{len(BENCH_POSITIONS)}: "
+                + f"{nodes} nodes, {elapsed * 1000:.0f} ms"
+            )
+    finally:
+        engine.quit()
+    milliseconds: int = int(total_time * 1000)
+    output("=" * 30)
+    output(f"Total time (ms) : {milliseconds}")
+    output(f"Nodes searched  : {total_nodes}")
+    output(f"Nodes/second    : {total_nodes * 1000 // max(milliseconds, 1)}")
+    return total_nodes, milliseconds
@@ -5,11 +5,71 @@ White Rabbit chess engine.
 
 Book and Syzygy moves.
 """
-from typing import Callable
-import chess.polyglot
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import chess
 import chess.syzygy
+import numpy as np
 from chess import Board, Move
 
+from .engine.zobrist import push, zobrist_key
+from .polyglot import BookIndex, decode_move
+
+BOOK_CACHE_SIZE: int = 4096
+"""Maximum number of cached book probes."""
+SYZYGY_CACHE_SIZE: int = 65536
+"""Maximum number of cached Syzygy probes."""
+MISSING: Any = object()
+"""Returned by :meth:`ProbeCache.get` for positions not in cache."""
+
+
+class ProbeCache:
+    """Least recently used cache of probe results, by Zobrist key."""
+
+    def __init__(self, size: int) -> None:
+        """
+        Initialize cache.
+
+        :param int size: Maximum number of results, least recently used
+            ones are evicted.
+        """
+        self.size: int = size
+        """Maximum number of results."""
+        self.results: OrderedDict[int, Any] = OrderedDict()
+        """Results by Zobrist key, least recently used first."""
+        self.hits: int = 0
+        """Number of results found in cache."""
+        self.misses: int = 0
+        """Number of results not found in cache."""
+
+    def get(self, key: int) -> Any:
+        """
+        Get a cached result.
+
+        :param int key: Position Zobrist key.
+        :return Any: Result, :data:`MISSING` if not in cache.
+        """
+        result: Any = self.results.get(key, MISSING)
+        if result is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.results.move_to_end(key)
+        return result
+
+    def put(self, key: int, result: Any) -> None:
+        """
+        Cache a result.
+
+        :param int key: Position Zobrist key.
+        :param Any result: Probe result.
+        """
+        self.results[key] = result
+        if len(self.results) > self.size:
+            self.results.popitem(last=False)
+
 
 class Book:
     """Engine's own book and syzygy."""
@@ -27,14 +87,72 @@ class Book:
         """Path to book BIN file."""
         self.syzygy_path: str = syzygy_path
         """Path to Syzygy tables."""
-        self.book: chess.polyglot.MemoryMappedReader = (
-            chess.polyglot.open_reader(self.book_path)
-        )
-        """Book python-chess object."""
+        self.book: BookIndex = BookIndex.open(self.book_path)
+        """Compiled book."""
+        self.generator: np.random.Generator = np.random.default_rng()
+        """Random generator of book moves."""
         self.syzygy_tables: chess.syzygy.Tablebase = (
             chess.syzygy.open_tablebase(syzygy_path)
         )
         """Syzygy tables python-chess object."""
+        self.book_cache: ProbeCache = ProbeCache(BOOK_CACHE_SIZE)
+        """Book moves and weights of positions."""
+        self.syzygy_cache: ProbeCache = ProbeCache(SYZYGY_CACHE_SIZE)
+        """WDL and DTZ of positions, None if not in tables."""
+        self.syzygy_pieces: int = max(
+            (len(key) - 1 for key in self.syzygy_tables.wdl), default=0
+        )
+        """Number of pieces of largest Syzygy table."""
+        self.tbhits: int = 0
+        """Number of Syzygy tables probes."""
+        self.probe_time: float = 0.0
+        """Time spent probing book and tables, in seconds."""
+
+    def stats(self) -> dict[str, float]:
+        """
+        Get cache statistics.
+
+        :return dict[str, float]: Cache hits and misses of book and Syzygy
+            tables, tablebase hits and probe time in seconds.
+        """
+        return {
+            "book_hits": self.book_cache.hits,
+            "book_misses": self.book_cache.misses,
+            "syzygy_hits": self.syzygy_cache.hits,
+            "syzygy_misses": self.syzygy_cache.misses,
+            "tbhits": self.tbhits,
+            "probe_time": self.probe_time,
+        }
+
+    def _book_entries(self, position: Board) -> list[tuple[Move, int]]:
+        """
+        Probe book, through cache.
+
+        :param Board position: Python-chess board to probe.
+        :return list[tuple[Move, int]]: Book moves and their weights.
+        """
+        key: int = zobrist_key(position)
+        entries: Any = self.book_cache.get(key)
+        if entries is MISSING:
+            start: float = time.perf_counter()
+            entries = self.book.entries(position)
+            self.probe_time += time.perf_counter() - start
+            self.book_cache.put(key, entries)
+        return entries
+
+    def _may_be_syzygy_position(self, position: Board) -> bool:
+        """
+        Check cheaply if a position may be in Syzygy tables.
+
+        Piece count and material of position must match a loaded table.
+
+        :param Board position: Python-chess board to check.
+        :return bool: Wether the position may be in the Syzygy tables.
+        """
+        return (
+            chess.popcount(position.occupied) <= self.syzygy_pieces
+            and chess.syzygy.calc_key(position) in self.syzygy_tables.wdl
+        )
 
     def is_book_position(self, position: Board) -> bool:
         """
@@ -43,7 +161,7 @@ class Book:
         :param Board position: Python-chess board to check.
         :return bool: Wether the position is in the book or not.
         """
-        return bool(self.book.get(position))
+        return bool(self._book_entries(position))
 
     def is_syzygy_position(self, position: Board) -> bool:
         """
@@ -52,63 +170,127 @@ class Book:
         :param Board position: Python-chess board to check.
         :return bool: Wether the position is in the Syzygy tables or not.
         """
-        return bool(self.syzygy_tables.get_dtz(position))
+        return (
+            self._may_be_syzygy_position(position)
+            and self._probe_syzygy(position, zobrist_key(position))
+            is not None
+        )
 
     def best_book_move(self, position: Board) -> Move:
         """
         Get the best move from book in a position.
 
+        Moves are drawn by weight, with a searchsorted on the cumulative
+        weights of the book index.
+
         :param Board position: Python-chess board to get best move.
         :return Move: The best move in position.
         :raises IndexError: If the move isn't found in book.
             Use :meth:`is_book_position` to check if the move is in book.
         """
-        return self.book.weighted_choice(position).move
+        entries: list[tuple[Move, int]] = self._book_entries(position)
+        if not entries:
+            raise IndexError(f"No book move in position {position.fen()}")
+        start, end = self.book.find(zobrist_key(position))  # type: ignore
+        if len(entries) < end - start:  # Illegal entries, from key collisions
+            weights: np.ndarray = np.array([weight for _, weight in entries])
+            return entries[
+                int(
+                    self.generator.choice(
+                        len(entries), p=weights / weights.sum()
+                    )
+                )
+            ][0]
+        cumulative: np.ndarray = self.book.cumulative[start:end]
+        before: int = int(self.book.cumulative[start - 1]) if start else 0
+        index: int = int(
+            np.searchsorted(
+                cumulative,
+                before
+                + self.generator.random() * (int(cumulative[-1]) - before),
+                side="right",
+            )
+        )
+        return decode_move(
+            position, int(self.book.moves[start + min(index, end - start - 1)])
+        )
 
-    def _best_syzygy_move(
-        self, position: Board, function: Callable[[Board], int]
-    ) -> Move:
+    def _probe_syzygy(
+        self, position: Board, key: int
+    ) -> Optional[tuple[int, int]]:
         """
-        Get the best move from Syzygy tables in a position.
-
-        Returned move is the best WHite's move.
+        Probe Syzygy tables, through cache.
 
-        :param Board position: Python-chess board to get best move.
-        :param Callable[[Board], int] function: Syzgy function to use.
-            Should be probe_wdl() or probe_dtz().
-        :return Move: The best move in position.
+        :param Board position: Python-chess board to probe.
+        :param int key: Position Zobrist key.
+        :return Optional[tuple[int, int]]: WDL and DTZ from side to move
+            point of view, None if position isn't in tables.
         """
-        best_move: Move = Move.null()
-        best_wdl: int = -3
-        for move in position.legal_moves:
-            test_board: Board = position.copy()
-            test_board.push(move)
-            if function(test_board) > best_wdl:
-                best_move = move
-        return best_move
+        result: Any = self.syzygy_cache.get(key)
+        if result is not MISSING:
+            return result
+        result = None
+        if self._may_be_syzygy_position(position):
+            start: float = time.perf_counter()
+            try:
+                result = (
+                    self.syzygy_tables.probe_wdl(position),
+                    self.syzygy_tables.probe_dtz(position),
+                )
+                self.tbhits += 1
+            except KeyError:  # Missing table
+                pass
+            self.probe_time += time.perf_counter() - start
+        self.syzygy_cache.put(key, result)
+        return result
 
     def best_syzygy_move(self, position: Board) -> Move:
         """
         Get the best move from Syzygy tables in a position.
 
-        Returned move is the best WHite's move.
+        Returned move is the best move of side to move. Moves are ranked in
+        one pass over legal moves by WDL, taking the 50-move rule into
+        account, then by DTZ: quickest zeroing win, slowest loss.
 
-        :param Board position: Python-chess board to get best move.
+        :param Board position: Python-chess board to get best move, restored
+            on return.
         :return Move: The best move in position.
         :raises IndexError: If the move isn't found in Syzygy tables.
-            Use :meth:`is_book_position` to check if the move is in book.
+            Use :meth:`is_syzygy_position` to check if the position is in
+            Syzygy tables.
         """
-        if self.syzygy_tables.get_wdl(position):
-            return self._best_syzygy_move(
-                position, self.syzygy_tables.probe_wdl
-            )
-        if self.syzygy_tables.get_dtz(position):
-            return self._best_syzygy_move(
-                position, self.syzygy_tables.probe_dtz
+        best_move: Move = Move.null()
+        best_rank: tuple[int, bool, int] = (-3, False, 0)
+        key: int = zobrist_key(position)
+        for move in list(position.legal_moves):
+            zeroing: bool = position.is_zeroing(move)
+            child_key: int = push(position, move, key)
+            try:
+                result: Optional[tuple[int, int]] = self._probe_syzygy(
+                    position, child_key
+                )
+            finally:
+                position.pop()
+            if result is None:
+                raise IndexError(
+                    f"Move {move} not found in Syzygy tables in position "
+                    + position.fen()
+                )
+            wdl: int = -result[0]
+            dtz: int = abs(result[1])
+            if (
+                abs(wdl) == 2
+                and not zeroing
+                and position.halfmove_clock + 1 + dtz > 100
+            ):
+                wdl //= 2  # 50-move rule reached before zeroing
+            rank: tuple[int, bool, int] = (
+                (wdl, zeroing, -dtz) if wdl > 0 else (wdl, False, dtz)
             )
-        raise IndexError(
-            f"No moves found in Syzygy tables in position {position.fen()}"
-        )
+            if rank > best_rank:
+                best_move = move
+                best_rank = rank
+        return best_move
 
     def is_table_position(self, position: Board) -> bool:
         """
@@ -5,10 +5,11 @@ White Rabbit chess engine.
 
 Command Line Interface.
 """
+import glob
+
 import click
 
 from . import train_start, train_cleanup
-from .uci import UCI
 
 
 @click.group(invoke_without_command=True)
@@ -16,11 +17,140 @@ from .uci import UCI
 def main(ctx):
     """Main context."""
     if not ctx.invoked_subcommand:
+        # Imported here so that other subcommands don't load the engine
+        from .uci import UCI  # pylint: disable=C0415
+
         print("Connected! #7089")
         uci: UCI = UCI()
         uci.mainloop()
 
 
+@main.command(name="bench")
+@click.argument("depth", default=4, type=click.IntRange(1, 64))
+@click.argument("threads", default=1, type=click.IntRange(1, 256))
+@click.argument(
+    "hash_size", metavar="[HASH]", default=32, type=click.IntRange(1, 4096)
+)
+def bench_command(depth: int, threads: int, hash_size: int):
+    """
+    Benchmark engine speed.
+
+    Searches a fixed set of positions and prints total nodes, time and
+    nodes per second. With one thread, total nodes is a signature of the
+    build.
+
+    :param int depth: Search depth.
+    :param int threads: Number of search processes.
+    :param int hash_size: Transposition table size, in megabytes.
+    """
+    # Imported here so that other subcommands don't load the engine
+    from .bench import bench  # pylint: disable=C0415
+
+    bench(depth, threads, hash_size, output=click.echo)
+
+
+@main.command()
+@click.option(
+    "--input", "input_path", required=True, type=click.Path(exists=True)
+)
+@click.option("--output", "output_path", required=True, type=click.Path())
+@click.option("--depth", default=4, type=click.IntRange(1, 64))
+@click.option("--workers", default=1, type=click.IntRange(1, 256))
+def analyse(input_path: str, output_path: str, depth: int, workers: int):
+    """
+    Analyse positions of an EPD or FEN file.
+
+    Writes one JSON line per position, in input order. Positions already in
+    output are skipped, so an interrupted analysis can be resumed.
+
+    :param str input_path: EPD or FEN file, one position per line.
+    :param str output_path: JSON lines file.
+    :param int depth: Search depth.
+    :param int workers: Number of search processes.
+    """
+    # Imported here so that other subcommands don't load the engine
+    from .analyse import analyse as run_analyse  # pylint: disable=C0415
+
+    with click.progressbar(
+        length=0, label="Analysing", show_pos=True, show_percent=False
+    ) as progress:
+        count: int = run_analyse(
+            input_path, output_path, depth, workers, progress.update
+        )
+    click.echo(f"{count} positions analysed")
+
+
+@main.command()
+@click.argument("networks", nargs=-1, type=click.Path(exists=True))
+@click.option("--gauntlet", type=click.Path(exists=True), default=None)
+@click.option("--depth", default=1, type=click.IntRange(1, 64))
+@click.option("--openings", default=8, type=click.IntRange(1, 4096))
+@click.option("--workers", default=1, type=click.IntRange(1, 256))
+@click.option("--seed", default=0, type=int)
+@click.option("--cache", "cache_path", default="data/elo/games.jsonl")
+def elo(
+    networks: tuple[str, ...],
+    gauntlet: str | None,
+    depth: int,
+    openings: int,
+    workers: int,
+    seed: int,
+    cache_path: str,
+):
+    """
+    Rate saved networks with Elo.
+
+    Networks play each other (or the gauntlet network only) from training
+    pool openings, with both colors. Finished games are cached, so adding a
+    network only plays its games. Rates archived networks by default.
+
+    :param tuple[str, ...] networks: Networks paths.
+    :param str | None gauntlet: Network playing all others.
+    :param int depth: Depth to play at.
+    :param int openings: Openings per match.
+    :param int workers: Number of game processes.
+    :param int seed: Openings seed.
+    :param str cache_path: Finished games cache path.
+    """
+    # Imported here so that other subcommands don't load the networks
+    from .elo import rate  # pylint: disable=C0415
+
+    paths: list[str] = list(networks) or sorted(
+        glob.glob("data/archive/*.npz")
+    )
+    if len(paths) + (gauntlet not in (None, *paths)) < 2:
+        raise click.UsageError("At least two networks are needed")
+    with click.progressbar(length=0, label="Playing", show_pos=True) as bar:
+
+        def progress(done: int, total: int) -> None:
+            bar.length = total
+            bar.update(done - bar.pos)
+
+        try:
+            table = rate(
+                paths,
+                gauntlet=gauntlet,
+                depth=depth,
+                openings=openings,
+                workers=workers,
+                seed=seed,
+                cache_path=cache_path,
+                progress=progress,
+            )
+        except ValueError as error:
+            raise click.UsageError(str(error)) from error
+    click.echo(
+        f"{'Rank':>4} {'Name':<24} {'Elo':>6} {'+/-':>5} "
+        + f"{'Games':>6} {'Score':>6}"
+    )
+    for rank, row in enumerate(table, start=1):
+        click.echo(
+            f"{rank:>4} {row['name']:<24} {row['elo']:>6.0f} "
+            + f"{row['error']:>5.0f} {row['games']:>6} "
+            + f"{row['score']:>6.1%}"
+        )
+
+
 @main.group()
 def train():
     """
@@ -53,3 +183,72 @@ def cleanup():
     Removes config file.
     """
     train_cleanup()
+
+
+@train.command()
+@click.option("--book", "book_path", type=click.Path(exists=True))
+@click.option("--plies", default=8, type=int, show_default=True)
+@click.option("--syzygy", "syzygy_path", type=click.Path(exists=True))
+@click.option("--material", "materials", multiple=True, type=str)
+@click.option("--count", default=1000, type=int, show_default=True)
+@click.option("--seed", default=None, type=int)
+@click.option("--output", "output_path", default=None, type=click.Path())
+def positions(
+    book_path: str | None,
+    plies: int,
+    syzygy_path: str | None,
+    materials: tuple[str, ...],
+    count: int,
+    seed: int | None,
+    output_path: str | None,
+):
+    """
+    Generate training positions.
+
+    Writes a pool of random book lines and Syzygy validated endgames, from
+    which training iterations draw their starting positions.
+
+    :param str | None book_path: Polyglot book to play lines from.
+    :param int plies: Length of book lines.
+    :param str | None syzygy_path: Syzygy tables validating endgames.
+    :param tuple[str, ...] materials: Endgames material, such as "KRRvK".
+    :param int count: Number of positions per source.
+    :param int | None seed: Random seed.
+    :param str | None output_path: Pool path, default training pool if None.
+    """
+    # Imported here so that other subcommands don't load the trainer
+    # pylint: disable=C0415
+    import chess.syzygy
+    import numpy as np
+
+    from .polyglot import BookIndex
+    from .trainer.config import POOL_PATH
+    from .trainer.positions import (
+        PositionPool,
+        book_positions,
+        endgame_positions,
+    )
+
+    if materials and syzygy_path is None:
+        raise click.UsageError("--material requires --syzygy")
+    generator: np.random.Generator = np.random.default_rng(seed)
+    boards: list = []
+    if book_path is not None:
+        boards.extend(
+            book_positions(BookIndex.open(book_path), count, plies, generator)
+        )
+    if materials:
+        with chess.syzygy.open_tablebase(syzygy_path) as tablebase:
+            for material in materials:
+                try:
+                    boards.extend(
+                        endgame_positions(
+                            tablebase, material, count, generator
+                        )
+                    )
+                except ValueError as exception:
+                    raise click.BadParameter(
+                        str(exception), param_hint="--material"
+                    ) from exception
+    PositionPool.save(output_path or POOL_PATH, boards)
+    click.echo(f"{len(boards)} positions written")
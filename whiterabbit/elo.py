@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+Elo rating of saved networks.
+
+Networks play each other in parallel processes, each opening twice with
+colors swapped. Finished games are cached by networks hashes, so that only
+games involving new networks are played. Ratings are fitted with a
+Bayesian Elo model: white advantage and draw Elo like BayesElo, and
+virtual draws between opponents as prior.
+"""
+import json
+import os
+import random
+import zlib
+from typing import Any, Callable, Iterator, Optional
+
+import chess
+import numpy as np
+
+from .engine import CONTEXT
+from .neural_network import NeuralNetwork
+from .neural_network.utils.hash import network_hash
+from .trainer.functions import play_game
+from .trainer.positions import PositionPool
+
+CACHE_PATH: str = "data/elo/games.jsonl"
+"""Finished games cache."""
+ADVANTAGE: float = 32.8
+"""Elo advantage of playing White."""
+DRAW_ELO: float = 97.3
+"""Elo width of draws."""
+PRIOR_DRAWS: float = 2.0
+"""Virtual draws between each pair of opponents."""
+CONFIDENCE: float = 1.96
+"""Error bars width, in standard deviations (95%)."""
+ELO_SCALE: float = np.log(10) / 400
+"""Logistic scale of Elo differences."""
+
+GameKey = tuple[str, str, str, int]
+"""White and Black networks hashes, opening FEN and depth."""
+
+networks_cache: dict[str, NeuralNetwork] = {}
+"""Networks loaded by a game process, by path."""
+
+
+def game_key(white: str, black: str, opening: str, depth: int) -> GameKey:
+    """
+    Build a cache key.
+
+    :param str white: White network hash.
+    :param str black: Black network hash.
+    :param str opening: Opening FEN.
+    :param int depth: Depth.
+    :return GameKey: Cache key.
+    """
+    return white, black, opening, depth
+
+
+def play_task(
+    task: tuple[GameKey, str, str]
+) -> tuple[GameKey, int, int]:
+    """
+    Play a game in a game process.
+
+    Random move choices are seeded from the game key, so that a game is
+    played the same way each time.
+
+    :param tuple[GameKey, str, str] task: Game key, White and Black
+        networks paths.
+    :return tuple[GameKey, int, int]: Game key, result (1 if White won,
+        -1 if Black won, else 0) and number of plies.
+    """
+    key, white_path, black_path = task
+    for path in (white_path, black_path):
+        if path not in networks_cache:
+            networks_cache[path] = NeuralNetwork.load(path)
+    random.seed(zlib.crc32(repr(key).encode()))
+    game: chess.Board = play_game(
+        networks_cache[white_path], networks_cache[black_path], key[2], key[3]
+    )
+    outcome: chess.Outcome = game.outcome(claim_draw=True)  # type: ignore
+    result: int = 0
+    if outcome.winner is not None:
+        result = 1 if outcome.winner is chess.WHITE else -1
+    return key, result, len(game.move_stack)
+
+
+class GameCache:
+    """Finished games, stored as JSON lines."""
+
+    def __init__(self, path: str = CACHE_PATH) -> None:
+        """
+        Load cache.
+
+        A partial last line, left by an interrupted write, is removed so
+        that next games are appended after complete lines.
+
+        :param str path: Cache path.
+        """
+        self.path: str = path
+        """Cache path."""
+        self.results: dict[GameKey, int] = {}
+        """Result of each finished game."""
+        if not os.path.exists(path):
+            return
+        end: int = 0  # Offset after last complete line
+        with open(path, "rb") as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break  # Interrupted write
+                end += len(line)
+                game: dict[str, Any] = json.loads(line)
+                self.results[
+                    game_key(
+                        game["white"],
+                        game["black"],
+                        game["opening"],
+                        game["depth"],
+                    )
+                ] = game["result"]
+        if end != os.path.getsize(path):
+            with open(path, "rb+") as file:
+                file.truncate(end)
+
+    def add(self, key: GameKey, result: int, plies: int) -> None:
+        """
+        Cache a finished game.
+
+        :param GameKey key: Game key.
+        :param int result: 1 if White won, -1 if Black won, else 0.
+        :param int plies: Length of the game.
+        """
+        self.results[key] = result
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(
+                json.dumps(
+                    {
+                        "white": key[0],
+                        "black": key[1],
+                        "opening": key[2],
+                        "depth": key[3],
+                        "result": result,
+                        "plies": plies,
+                    }
+                )
+                + "\n"
+            )
+
+
+def pairings(
+    players: int, gauntlet: Optional[int] = None
+) -> Iterator[tuple[int, int]]:
+    """
+    List matches.
+
+    :param int players: Number of networks.
+    :param Optional[int] gauntlet: Network playing all others, round-robin
+        if None.
+    :return Iterator[tuple[int, int]]: Pairs of networks indexes.
+    """
+    for first in range(players):
+        for second in range(first + 1, players):
+            if gauntlet is None or gauntlet in (first, second):
+                yield first, second
+
+
+def fit_ratings(
+    players: int, games: list[tuple[int, int, int]]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fit Bayesian Elo ratings.
+
+    The posterior is maximized with Newton's method, ratings averaging 0.
+    Error bars come from the curvature of the posterior at its maximum.
+
+    :param int players: Number of networks.
+    :param list[tuple[int, int, int]] games: White index, Black index and
+        result (1 if White won, -1 if Black won, else 0) of each game.
+    :return tuple[np.ndarray, np.ndarray]: Ratings and error bars.
+    """
+    white: np.ndarray = np.array([game[0] for game in games], dtype=np.intp)
+    black: np.ndarray = np.array([game[1] for game in games], dtype=np.intp)
+    results: np.ndarray = np.array([game[2] for game in games], dtype=int)
+    weights: np.ndarray = np.ones(len(games))
+    advantages: np.ndarray = np.full(len(games), ADVANTAGE)
+    pairs: set[tuple[int, int]] = {
+        (min(game[:2]), max(game[:2])) for game in games
+    }
+    for first, second in sorted(pairs):  # Prior: virtual draws
+        white = np.append(white, first)
+        black = np.append(black, second)
+        results = np.append(results, 0)
+        weights = np.append(weights, PRIOR_DRAWS)
+        advantages = np.append(advantages, 0.0)
+    incidence: np.ndarray = np.zeros((len(white), players))
+    incidence[np.arange(len(white)), white] += 1
+    incidence[np.arange(len(white)), black] -= 1
+
+    def gradient(ratings: np.ndarray) -> np.ndarray:
+        difference: np.ndarray = incidence @ ratings + advantages
+        win: np.ndarray = 1 / (
+            1 + np.exp(-ELO_SCALE * (difference - DRAW_ELO))
+        )
+        loss: np.ndarray = 1 / (
+            1 + np.exp(-ELO_SCALE * (-difference - DRAW_ELO))
+        )
+        draw: np.ndarray = np.maximum(1 - win - loss, 1e-12)
+        slope: np.ndarray = np.select(
+            [results > 0, results < 0],
+            [1 - win, loss - 1],
+            (loss * (1 - loss) - win * (1 - win)) / draw,
+        )
+        return ELO_SCALE * incidence.T @ (weights * slope)
+
+    def hessian(ratings: np.ndarray) -> np.ndarray:
+        step: float = 1e-3
+        return np.array(
+            [
+                (
+                    gradient(ratings + step * unit)
+                    - gradient(ratings - step * unit)
+                )
+                / (2 * step)
+                for unit in np.eye(players)
+            ]
+        )
+
+    ratings: np.ndarray = np.zeros(players)
+    for _ in range(100):
+        update: np.ndarray = np.linalg.pinv(hessian(ratings)) @ gradient(
+            ratings
+        )
+        ratings -= update
+        ratings -= ratings.mean()
+        if np.abs(update).max() < 1e-6:
+            break
+    covariance: np.ndarray = np.linalg.pinv(-hessian(ratings))
+    errors: np.ndarray = CONFIDENCE * np.sqrt(
+        np.maximum(np.diag(covariance), 0)
+    )
+    return ratings, errors
+
+
+def rate(
+    paths: list[str],
+    *,
+    gauntlet: Optional[str] = None,
+    depth: int = 1,
+    openings: int = 8,
+    workers: int = 1,
+    seed: int = 0,
+    cache_path: str = CACHE_PATH,
+    progress: Callable[[int, int], None] = lambda done, total: None,
+) -> list[dict[str, Any]]:
+    """
+    Rate networks.
+
+    Each match plays every opening twice, colors swapped. Openings are
+    drawn from the training positions pool with a fixed seed, so that
+    cached games are found again.
+
+    :param list[str] paths: Networks paths.
+    :param Optional[str] gauntlet: Path of a network playing all others,
+        round-robin if None.
+    :param int depth: Depth to play at.
+    :param int openings: Openings per match.
+    :param int workers: Number of game processes.
+    :param int seed: Openings seed.
+    :param str cache_path: Finished games cache path.
+    :param Callable[[int, int], None] progress: Called with number of games
+        done and number of games after each game.
+    :return list[dict[str, Any]]: Name, rating, error, games and score of
+        each network, best first.
+    :raises ValueError: If a network is given twice.
+    """
+    if gauntlet is not None and gauntlet not in paths:
+        paths = [gauntlet, *paths]
+    hashes: list[str] = [
+        f"{network_hash(NeuralNetwork.load(path)):032x}" for path in paths
+    ]
+    if len(set(hashes)) != len(hashes):
+        raise ValueError("Same network given twice")
+    fens: list[str] = list(
+        dict.fromkeys(  # Small pools are sampled with replacement
+            fen
+            for _, fen in PositionPool().sample(
+                openings, np.random.default_rng(seed)
+            )
+        )
+    )
+    cache: GameCache = GameCache(cache_path)
+    games: list[tuple[int, int, GameKey]] = []
+    for first, second in pairings(
+        len(paths), None if gauntlet is None else paths.index(gauntlet)
+    ):
+        for fen in fens:
+            for white, black in ((first, second), (second, first)):
+                games.append(
+                    (
+                        white,
+                        black,
+                        game_key(hashes[white], hashes[black], fen, depth),
+                    )
+                )
+    tasks: list[tuple[GameKey, str, str]] = [
+        (key, paths[white], paths[black])
+        for white, black, key in games
+        if key not in cache.results
+    ]
+    done: int = len(games) - len(tasks)
+    progress(done, len(games))
+    if tasks:
+        with CONTEXT.Pool(workers) as pool:
+            for key, result, plies in pool.imap_unordered(play_task, tasks):
+                cache.add(key, result, plies)
+                done += 1
+                progress(done, len(games))
+    results: list[tuple[int, int, int]] = [
+        (white, black, cache.results[key]) for white, black, key in games
+    ]
+    ratings, errors = fit_ratings(len(paths), results)
+    table: list[dict[str, Any]] = []
+    for index, path in enumerate(paths):
+        played: list[float] = [
+            (1 + result * (1 if white == index else -1)) / 2
+            for white, black, result in results
+            if index in (white, black)
+        ]
+        table.append(
+            {
+                "name": os.path.splitext(os.path.basename(path))[0],
+                "elo": float(ratings[index]),
+                "error": float(errors[index]),
+                "games": len(played),
+                "score": sum(played) / max(len(played), 1),
+            }
+        )
+    return sorted(table, key=lambda row: -row["elo"])
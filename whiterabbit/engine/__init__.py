@@ -5,24 +5,93 @@ White Rabbit chess engine.
 
 Main engine.
 """
+import multiprocessing
+from typing import Callable, Optional
+
 import chess
 
 from ..neural_network import NeuralNetwork
 from .evaluation import Evaluation
+from .limits import Limits, StopFlag
+from .search import HASH_SIZE, Search
+from .transposition import TranspositionTable
+
+NETWORK_PATH: str = "data/best-network.npz"
+"""Default network file."""
+CONTEXT = multiprocessing.get_context("spawn")
+"""
+Search processes context.
+
+Forking would copy locks held by other threads, such as the stdin lock held
+by the UCI main loop, and deadlock the child.
+"""
 
 
 class Engine:
     """Engine class."""
 
-    def __init__(self):
+    def __init__(self, network_path: str = NETWORK_PATH):
         """
         Initialize engine.
 
-        :param NeuralNetwork neural_network: Neural network to use.
+        :param str network_path: Path of neural network to use.
         """
-        self.neural_network: NeuralNetwork = NeuralNetwork.load(
-            "best_network.npz"
-        )
+        self.neural_network: NeuralNetwork = NeuralNetwork.load(network_path)
+        self.transpositions: TranspositionTable = TranspositionTable(HASH_SIZE)
+        """Transposition table, kept between searches of a game."""
+
+    def set_hash(self, size: int, buffer: Optional[memoryview] = None) -> None:
+        """
+        Resize transposition table.
+
+        :param int size: Table size in megabytes.
+        :param Optional[memoryview] buffer: Memory shared with other engines
+            searching in parallel, allocated if None.
+        """
+        self.transpositions.resize(size, buffer)
 
-    def search(self, position: chess.Board, *, movetime: int) -> Evaluation:
-        pass
+    def new_game(self) -> None:
+        """
+        Start a new game.
+
+        Resets neural network correction and transposition table.
+        """
+        self.neural_network.game_end()
+        self.neural_network.new_game()
+        self.transpositions.clear()
+
+    def search(
+        self,
+        position: chess.Board,
+        limits: Optional[Limits] = None,
+        *,
+        stop: Optional[StopFlag] = None,
+        info: Optional[Callable[[Evaluation], None]] = None,
+        helper: int = 0,
+        ponderhit: Optional[StopFlag] = None,
+    ) -> Evaluation:
+        """
+        Search best move in a position.
+
+        Runs an iterative deepening alpha-beta search, see :class:`Search`.
+
+        :param chess.Board position: Position to search.
+        :param Optional[Limits] limits: Search limits, infinite if None.
+        :param Optional[StopFlag] stop: Search stops once this flag is set.
+        :param Optional[Callable[[Evaluation], None]] info: Called with
+            evaluation of each completed depth.
+        :param int helper: Index among parallel searches, 0 for main search.
+        :param Optional[StopFlag] ponderhit: Set on ponder hit.
+        :return Evaluation: Evaluation of the best move found.
+        """
+        search: Search = Search(
+            self.neural_network,
+            limits or Limits(),
+            stop=stop,
+            info=info,
+            transpositions=self.transpositions,
+            helper=helper,
+            ponderhit=ponderhit,
+        )
+        # Only moves since last irreversible one matter for repetitions
+        return search.run(position.copy(stack=position.halfmove_clock))
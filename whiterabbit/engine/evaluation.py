@@ -5,9 +5,39 @@ White Rabbit chess engine.
 
 Engine evaluation.
 """
+from typing import Optional
+
 import chess
 
 
+class Line:
+    """A principal variation of a MultiPV search."""
+
+    def __init__(
+        self,
+        pv: list[chess.Move],
+        score: tuple[int, int],
+        depth: int,
+        nodes: int,
+    ):
+        """
+        A principal variation.
+
+        :param list[chess.Move] pv: Moves, first one is a root move.
+        :param tuple[int, int] score: Centipawns and mate score.
+        :param int depth: Search depth.
+        :param int nodes: Nodes searched for this line only.
+        """
+        self.pv: list[chess.Move] = pv
+        """Moves, first one is a root move."""
+        self.score: tuple[int, int] = score
+        """Centipawns and mate score."""
+        self.depth: int = depth
+        """Search depth."""
+        self.nodes: int = nodes
+        """Nodes searched for this line only."""
+
+
 class Evaluation:
     """An engine evaluation of a position."""
 
@@ -22,6 +52,9 @@ class Evaluation:
         nps: int,
         tbhits: int,
         cpuload: int,
+        *,
+        pv: Optional[list[chess.Move]] = None,
+        lines: Optional[list[Line]] = None,
     ):
         """
         An engine evaluation.
@@ -35,6 +68,10 @@ class Evaluation:
         :param int nps: Nodes per second.
         :param int tbhits: Tablebase hits.
         :param int cpuload: Permill of CPU used.
+        :param Optional[list[chess.Move]] pv: Principal variation of first
+            line, defaults to its best move.
+        :param Optional[list[Line]] lines: Line of each best move, defaults
+            to lines with evaluation score and depth.
         """
         self.depth: int = depth
         """Search depth."""
@@ -54,6 +91,13 @@ class Evaluation:
         """Tablebase hits."""
         self.cpuload: int = cpuload
         """Permill of CPU used."""
+        self.pv: list[chess.Move] = pv or best_moves[:1]
+        """Principal variation of first line."""
+        self.lines: list[Line] = lines or [
+            Line(self.pv if index == 0 else [move], score, depth, nodes)
+            for index, move in enumerate(best_moves)
+        ]
+        """Line of each best move, best first."""
 
     def info(self, multi_pv: int) -> None:
         """
@@ -64,33 +108,32 @@ class Evaluation:
 
         :param int multi_pv: MultiPV value.
         """
-        for multipv, move in enumerate(self.best_moves):
-            if multipv < multi_pv:
-                score: str = f"cp {self.score[0]}"
-                if self.score[1] > 0:
-                    score = f"mate {self.score[1]}"
-                print(
-                    "info",
-                    "depth",
-                    self.depth,
-                    "seldepth",
-                    self.depth,
-                    "time",
-                    self.time,
-                    "nodes",
-                    self.nodes,
-                    "pv",
-                    move.uci(),
-                    "multipv",
-                    multipv + 1,
-                    "score",
-                    score,
-                    "hashfull",
-                    self.hash_full,
-                    "nps",
-                    self.nps,
-                    "tbhits",
-                    self.tbhits,
-                    "cpuload",
-                    self.cpuload,
-                )
+        for multipv, line in enumerate(self.lines[:multi_pv]):
+            score: str = f"cp {line.score[0]}"
+            if line.score[1]:
+                score = f"mate {line.score[1]}"
+            print(
+                "info",
+                "depth",
+                line.depth,
+                "seldepth",
+                line.depth,
+                "time",
+                self.time,
+                "nodes",
+                line.nodes,
+                "pv",
+                " ".join(pv_move.uci() for pv_move in line.pv),
+                "multipv",
+                multipv + 1,
+                "score",
+                score,
+                "hashfull",
+                self.hash_full,
+                "nps",
+                self.nps,
+                "tbhits",
+                self.tbhits,
+                "cpuload",
+                self.cpuload,
+            )
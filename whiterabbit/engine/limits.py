@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+Search limits and time management.
+"""
+import time
+from typing import Optional, Protocol
+
+import chess
+
+MOVE_OVERHEAD: int = 50
+"""Time kept for communication delays, in milliseconds."""
+OPENING_MOVES_LEFT: int = 50
+"""Expected moves left to play at game start, without moves to go."""
+ENDGAME_MOVES_LEFT: int = 20
+"""Expected moves left to play in endgames, without moves to go."""
+HARD_RATIO: int = 5
+"""Hard deadline is at most HARD_RATIO times soft deadline."""
+PHASE_WEIGHTS: dict[chess.PieceType, int] = {
+    chess.KNIGHT: 1,
+    chess.BISHOP: 1,
+    chess.ROOK: 2,
+    chess.QUEEN: 4,
+}
+"""Weight of pieces in game phase, total is 24 at game start."""
+
+
+def game_phase(board: chess.Board) -> float:
+    """
+    Estimate game phase from pieces left.
+
+    :param chess.Board board: Position.
+    :return float: 1 at game start, down to 0 when only kings and pawns are
+        left.
+    """
+    phase: int = sum(
+        weight * chess.popcount(board.pieces_mask(piece_type, chess.WHITE))
+        + weight * chess.popcount(board.pieces_mask(piece_type, chess.BLACK))
+        for piece_type, weight in PHASE_WEIGHTS.items()
+    )
+    return min(phase, 24) / 24
+
+
+class StopFlag(Protocol):
+    """Search stop condition, e.g. a threading or multiprocessing Event."""
+
+    def is_set(self) -> bool:
+        """
+        Check flag.
+
+        :return bool: Wether search should stop.
+        """
+
+
+class Limits:
+    """Search limits, as given by UCI `go` command."""
+
+    def __init__(
+        self,
+        *,
+        movetime: int = 0,
+        wtime: Optional[int] = None,
+        btime: Optional[int] = None,
+        winc: int = 0,
+        binc: int = 0,
+        movestogo: Optional[int] = None,
+        depth: Optional[int] = None,
+        nodes: Optional[int] = None,
+        mate: Optional[int] = None,
+        infinite: bool = False,
+        ponder: bool = False,
+        searchmoves: Optional[list[chess.Move]] = None,
+        multipv: int = 1,
+    ) -> None:
+        """
+        Initialize limits.
+
+        No limits means searching until stopped.
+
+        :param int movetime: Time to search in milliseconds, 0 for none.
+        :param Optional[int] wtime: White's clock in milliseconds.
+        :param Optional[int] btime: Black's clock in milliseconds.
+        :param int winc: White's increment per move in milliseconds.
+        :param int binc: Black's increment per move in milliseconds.
+        :param Optional[int] movestogo: Moves to play until next time
+            control, sudden death if None.
+        :param Optional[int] depth: Maximum depth.
+        :param Optional[int] nodes: Maximum nodes.
+        :param Optional[int] mate: Search a mate in this number of moves.
+        :param bool infinite: Search until stopped.
+        :param bool ponder: Search on opponent's time, time limits only apply
+            after ponder hit.
+        :param Optional[list[chess.Move]] searchmoves: Root moves to search,
+            all legal moves if None.
+        :param int multipv: Number of best lines to search.
+        """
+        self.movetime: int = movetime
+        """Time to search in milliseconds, 0 for none."""
+        self.wtime: Optional[int] = wtime
+        """White's clock in milliseconds."""
+        self.btime: Optional[int] = btime
+        """Black's clock in milliseconds."""
+        self.winc: int = winc
+        """White's increment per move in milliseconds."""
+        self.binc: int = binc
+        """Black's increment per move in milliseconds."""
+        self.movestogo: Optional[int] = movestogo
+        """Moves to play until next time control."""
+        self.depth: Optional[int] = depth
+        """Maximum depth."""
+        self.nodes: Optional[int] = nodes
+        """Maximum nodes."""
+        self.mate: Optional[int] = mate
+        """Search a mate in this number of moves."""
+        self.infinite: bool = infinite
+        """Search until stopped."""
+        self.ponder: bool = ponder
+        """Search on opponent's time."""
+        self.searchmoves: Optional[list[chess.Move]] = searchmoves
+        """Root moves to search, all legal moves if None."""
+        self.multipv: int = multipv
+        """Number of best lines to search."""
+
+    def is_timed(self) -> bool:
+        """
+        Check if search is limited by time.
+
+        :return bool: Wether a move time or clocks are given.
+        """
+        return bool(self.movetime) or (
+            self.wtime is not None or self.btime is not None
+        )
+
+
+class TimeManager:
+    """Compute and check search deadlines."""
+
+    def __init__(
+        self,
+        limits: Limits,
+        board: chess.Board,
+        ponderhit: Optional[StopFlag] = None,
+    ) -> None:
+        """
+        Start timing a search.
+
+        With a clock, time is split over moves to go, or over moves expected
+        to be left from game phase, plus most of the increment.
+
+        :param Limits limits: Search limits.
+        :param chess.Board board: Position to search.
+        :param Optional[StopFlag] ponderhit: Set on ponder hit, deadlines
+            of pondering searches start from then.
+        """
+        self.start: float = time.perf_counter()
+        """Search start time."""
+        self.soft: Optional[int] = None
+        """Time after which no new depth is started, in milliseconds."""
+        self.hard: Optional[int] = None
+        """Time after which search is aborted, in milliseconds."""
+        clock: Optional[int] = limits.wtime if board.turn else limits.btime
+        if limits.infinite:
+            pass
+        elif limits.movetime:
+            self.soft = self.hard = max(limits.movetime - MOVE_OVERHEAD, 1)
+        elif clock is not None:
+            self.soft, self.hard = self._deadlines(
+                max(clock - MOVE_OVERHEAD, 1),
+                limits.winc if board.turn else limits.binc,
+                limits.movestogo,
+                game_phase(board),
+            )
+        self.ponderhit: Optional[StopFlag] = (
+            ponderhit if limits.ponder else None
+        )
+        """Ponder hit flag, None once hit or when not pondering."""
+        self.deadlines: tuple[Optional[int], Optional[int]] = (
+            self.soft,
+            self.hard,
+        )
+        """Soft and hard deadlines, counted from ponder hit."""
+        if limits.ponder:
+            self.soft = self.hard = None
+
+    @staticmethod
+    def _deadlines(
+        clock: int, increment: int, movestogo: Optional[int], phase: float
+    ) -> tuple[int, int]:
+        """
+        Compute deadlines from clock.
+
+        :param int clock: Usable time left, in milliseconds.
+        :param int increment: Increment per move, in milliseconds.
+        :param Optional[int] movestogo: Moves to play until next time
+            control, None for sudden death.
+        :param float phase: Game phase, see :func:`game_phase`.
+        :return tuple[int, int]: Soft and hard deadlines, in milliseconds.
+        """
+        moves_left: int = round(
+            ENDGAME_MOVES_LEFT
+            + (OPENING_MOVES_LEFT - ENDGAME_MOVES_LEFT) * phase
+        )
+        if movestogo:
+            moves_left = min(movestogo, moves_left)
+        hard: int = min(
+            clock // 2 if moves_left > 1 else clock * 4 // 5,
+            (clock // moves_left + increment) * HARD_RATIO,
+        )
+        soft: int = min(clock // moves_left + increment * 3 // 4, hard)
+        return max(soft, 1), max(hard, 1)
+
+    def _check_ponderhit(self) -> None:
+        """
+        Start deadlines if a ponder hit happened.
+
+        Search continues as a timed search without restarting.
+        """
+        if self.ponderhit is not None and self.ponderhit.is_set():
+            self.ponderhit = None
+            elapsed: int = self.elapsed()
+            soft, hard = self.deadlines
+            self.soft = None if soft is None else elapsed + soft
+            self.hard = None if hard is None else elapsed + hard
+
+    def elapsed(self) -> int:
+        """
+        Get search time.
+
+        :return int: Time since search start in milliseconds.
+        """
+        return int((time.perf_counter() - self.start) * 1000)
+
+    def soft_stop(self) -> bool:
+        """
+        Check if a new depth shouldn't be started.
+
+        :return bool: Wether soft deadline is reached.
+        """
+        self._check_ponderhit()
+        return self.soft is not None and self.elapsed() >= self.soft
+
+    def hard_stop(self) -> bool:
+        """
+        Check if search must be aborted.
+
+        :return bool: Wether hard deadline is reached.
+        """
+        self._check_ponderhit()
+        return self.hard is not None and self.elapsed() >= self.hard
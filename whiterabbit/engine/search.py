@@ -0,0 +1,612 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+Iterative deepening principal variation search.
+"""
+from typing import Callable, Optional
+
+import chess
+
+from ..neural_network import NeuralNetwork
+from .evaluation import Evaluation, Line
+from .limits import Limits, StopFlag, TimeManager
+from .transposition import (
+    EXACT,
+    LOWER,
+    UPPER,
+    TranspositionTable,
+    pack_move,
+    unpack_move,
+)
+from .zobrist import push, zobrist_key
+
+MATE_SCORE: int = 32000
+"""Score of a mate at root, mates at ply n are scored MATE_SCORE - n."""
+MATE_BOUND: int = MATE_SCORE - 1000
+"""Scores above this value are mates."""
+MAX_DEPTH: int = 64
+"""Maximum iterative deepening depth."""
+NETWORK_DEPTH: int = 1
+"""Network depth used for root move ordering."""
+CHECK_NODES: int = 1023
+"""Stop conditions are checked every CHECK_NODES + 1 nodes."""
+HASH_SIZE: int = 16
+"""Transposition table size in megabytes, when none is given."""
+SKIP_SIZE: list[int] = [1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 3, 3, 4, 4, 4, 4, 4, 4]
+"""Length of skipped depth blocks, by helper index."""
+SKIP_PHASE: list[int] = [0, 1, 0, 1, 2, 3, 0, 1, 2, 3, 4, 5, 0, 1, 2, 3, 4, 5]
+"""Offset of skipped depth blocks, by helper index."""
+PIECES_VALUES: dict[chess.PieceType, int] = {
+    chess.PAWN: 100,
+    chess.KNIGHT: 320,
+    chess.BISHOP: 330,
+    chess.ROOK: 500,
+    chess.QUEEN: 900,
+    chess.KING: 0,
+}
+"""Material value of each piece type, in centipawns."""
+
+
+class SearchAborted(Exception):
+    """Raised inside the search when a stop condition is reached."""
+
+
+def evaluate(board: chess.Board) -> int:
+    """
+    Static evaluation.
+
+    Material balance, plus a mop-up term driving a lone king to the edge.
+
+    :param chess.Board board: Position to evaluate.
+    :return int: Score in centipawns, from side to move point of view.
+    """
+    score: int = 0
+    for piece_type, value in PIECES_VALUES.items():
+        score += value * (
+            chess.popcount(board.pieces_mask(piece_type, chess.WHITE))
+            - chess.popcount(board.pieces_mask(piece_type, chess.BLACK))
+        )
+    for color, sign in ((chess.WHITE, 1), (chess.BLACK, -1)):
+        lone_king: bool = board.occupied_co[not color] == (
+            board.kings & board.occupied_co[not color]
+        )
+        if lone_king and score * sign > 0:
+            king: int = board.king(not color)  # type: ignore
+            own_king: int = board.king(color)  # type: ignore
+            center_distance: int = max(
+                3 - min(chess.square_file(king), 7 - chess.square_file(king)),
+                3 - min(chess.square_rank(king), 7 - chess.square_rank(king)),
+            )
+            score += sign * (
+                10 * center_distance
+                + 4 * (14 - chess.square_manhattan_distance(king, own_king))
+            )
+    return score if board.turn is chess.WHITE else -score
+
+
+def score_tuple(score: int) -> tuple[int, int]:
+    """
+    Convert a search score to an evaluation score.
+
+    :param int score: Search score.
+    :return tuple[int, int]: Centipawns and mate in moves (negative when
+        getting mated, 0 if no mate found).
+    """
+    if score > MATE_BOUND:
+        return (score, (MATE_SCORE - score + 1) // 2)
+    if score < -MATE_BOUND:
+        return (score, -(MATE_SCORE + score) // 2)
+    return (score, 0)
+
+
+def score_to_table(score: int, ply: int) -> int:
+    """
+    Convert a mate score from distance to root to distance to position.
+
+    :param int score: Search score.
+    :param int ply: Distance to root.
+    :return int: Score to store in transposition table.
+    """
+    if score > MATE_BOUND:
+        return score + ply
+    if score < -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_table(score: int, ply: int) -> int:
+    """
+    Convert a score stored by :func:`score_to_table` back.
+
+    :param int score: Stored score.
+    :param int ply: Distance to root.
+    :return int: Search score.
+    """
+    if score > MATE_BOUND:
+        return score - ply
+    if score < -MATE_BOUND:
+        return score + ply
+    return score
+
+
+class Search:
+    """A search of a position."""
+
+    def __init__(
+        self,
+        neural_network: NeuralNetwork,
+        limits: Limits,
+        *,
+        stop: Optional[StopFlag] = None,
+        info: Optional[Callable[[Evaluation], None]] = None,
+        transpositions: Optional[TranspositionTable] = None,
+        helper: int = 0,
+        ponderhit: Optional[StopFlag] = None,
+    ) -> None:
+        """
+        Initialize search.
+
+        :param NeuralNetwork neural_network: Network used for move ordering.
+        :param Limits limits: Search limits.
+        :param Optional[StopFlag] stop: Search stops once this flag is set.
+        :param Optional[Callable[[Evaluation], None]] info: Called with
+            evaluation of each completed depth.
+        :param Optional[TranspositionTable] transpositions: Transposition
+            table, kept between searches. A new one is allocated if None.
+        :param int helper: Index of this search among parallel searches
+            sharing a transposition table, 0 for the main one. Helpers skip
+            some depths, so that searches don't run in lockstep.
+        :param Optional[StopFlag] ponderhit: Set on ponder hit, pondering
+            searches become timed searches from then.
+        """
+        self.neural_network: NeuralNetwork = neural_network
+        """Network used for move ordering."""
+        self.limits: Limits = limits
+        """Search limits."""
+        self.stop: Optional[StopFlag] = stop
+        """Stop flag."""
+        self.info: Optional[Callable[[Evaluation], None]] = info
+        """Called with evaluation of each completed depth."""
+        self.time: TimeManager = TimeManager(limits, chess.Board())
+        """Time manager, restarted by :meth:`run`."""
+        self.nodes: int = 0
+        """Searched nodes."""
+        self.score: int = 0
+        """Score of last completed depth."""
+        self.root_score: int = 0
+        """Score of best root move of current depth, kept on abort."""
+        self.pv: list[list[chess.Move]] = [[] for _ in range(MAX_DEPTH + 1)]
+        """Triangular principal variation table."""
+        self.previous_pv: list[chess.Move] = []
+        """Principal variation of last completed depth."""
+        self.killers: list[list[chess.Move]] = [
+            [] for _ in range(MAX_DEPTH + 1)
+        ]
+        """Quiet moves causing beta cutoffs, by ply."""
+        self.transpositions: TranspositionTable = (
+            transpositions or TranspositionTable(HASH_SIZE)
+        )
+        """Transposition table."""
+        self.helper: int = helper
+        """Index among parallel searches."""
+        self.ponderhit: Optional[StopFlag] = ponderhit
+        """Ponder hit flag."""
+        self.max_nodes: float = limits.nodes or float("inf")
+        """Nodes after which search is aborted."""
+        self.keys: list[int] = []
+        """Zobrist keys of game positions since last irreversible move."""
+
+    def run(self, board: chess.Board) -> Evaluation:
+        """
+        Search a position with iterative deepening.
+
+        :param chess.Board board: Position to search, restored on return.
+        :return Evaluation: Evaluation of the best move found.
+        """
+        self.time = TimeManager(self.limits, board, self.ponderhit)
+        self.nodes = 0
+        self.score = 0
+        self.previous_pv = []
+        self.keys = self._history_keys(board)
+        self.transpositions.new_search()
+        root_moves: list[chess.Move] = self._root_moves(board)
+        if not root_moves:
+            self.score = -MATE_SCORE if board.is_check() else 0
+            return self._evaluation(0, [])
+        evaluation: Evaluation = self._evaluation(
+            0, [Line(root_moves[:1], score_tuple(0), 0, 0)]
+        )
+        max_depth: int = min(self.limits.depth or MAX_DEPTH, MAX_DEPTH)
+        if self.limits.mate:
+            max_depth = min(max_depth, 2 * self.limits.mate)
+        if (
+            len(root_moves) == 1
+            and self.limits.is_timed()
+            and not self.limits.ponder
+        ):
+            max_depth = 1
+        multipv: int = min(self.limits.multipv, len(root_moves))
+        for depth in range(1, max_depth + 1):
+            if self._skip_depth(depth, max_depth):
+                continue
+            lines: list[Line] = []
+            start_nodes: int = self.nodes  # Before current line search
+            try:
+                for _ in range(multipv):
+                    found: list[chess.Move] = [line.pv[0] for line in lines]
+                    start_nodes = self.nodes
+                    score: int = self._root(
+                        board,
+                        [move for move in root_moves if move not in found],
+                        depth,
+                        store=not lines,
+                    )
+                    lines.append(
+                        Line(
+                            self.pv[0],
+                            score_tuple(score),
+                            depth,
+                            self.nodes - start_nodes,
+                        )
+                    )
+            except SearchAborted:
+                if lines:
+                    # Lines of this depth, then remaining lines of last one
+                    found = [line.pv[0] for line in lines]
+                    lines.extend(
+                        line
+                        for line in evaluation.lines
+                        if line.pv[0] not in found
+                    )
+                    evaluation = self._evaluation(depth, lines[:multipv])
+                elif self.pv[0] and self.pv[0][0] != root_moves[0]:
+                    # A better move was fully searched before abort
+                    evaluation = self._evaluation(
+                        evaluation.depth,
+                        [
+                            Line(
+                                self.pv[0],
+                                score_tuple(self.root_score),
+                                evaluation.depth,
+                                self.nodes - start_nodes,
+                            )
+                        ],
+                    )
+                break
+            self.score = lines[0].score[0]
+            self.previous_pv = lines[0].pv
+            for line in reversed(lines):
+                root_moves.remove(line.pv[0])
+                root_moves.insert(0, line.pv[0])
+            evaluation = self._evaluation(depth, lines)
+            if self.info is not None:
+                self.info(evaluation)
+            if self.time.soft_stop() or (
+                multipv == 1 and abs(self.score) > MATE_BOUND
+            ):
+                break
+        return evaluation
+
+    def _evaluation(self, depth: int, lines: list[Line]) -> Evaluation:
+        """
+        Build an evaluation of current search state.
+
+        :param int depth: Completed depth.
+        :param list[Line] lines: Principal variations, best first.
+        :return Evaluation: Evaluation.
+        """
+        elapsed: int = self.time.elapsed()
+        return Evaluation(
+            depth,
+            elapsed,
+            self.nodes,
+            [line.pv[0] for line in lines],
+            lines[0].score if lines else score_tuple(self.score),
+            self.transpositions.hashfull(),
+            self.nodes * 1000 // max(elapsed, 1),
+            0,
+            0,
+            pv=list(lines[0].pv) if lines else None,
+            lines=lines,
+        )
+
+    def _skip_depth(self, depth: int, max_depth: int) -> bool:
+        """
+        Check if a helper search should skip a depth.
+
+        Last depth is never skipped.
+
+        :param int depth: Depth to search.
+        :param int max_depth: Last depth.
+        :return bool: Wether depth must be skipped.
+        """
+        if not self.helper or depth == max_depth:
+            return False
+        index: int = (self.helper - 1) % len(SKIP_SIZE)
+        return bool((depth + SKIP_PHASE[index]) // SKIP_SIZE[index] % 2)
+
+    @staticmethod
+    def _history_keys(board: chess.Board) -> list[int]:
+        """
+        Compute keys of positions that may repeat, root position last.
+
+        :param chess.Board board: Root position.
+        :return list[int]: Zobrist keys, since last irreversible move.
+        """
+        history: chess.Board = board.copy()
+        keys: list[int] = [zobrist_key(history)]
+        for _ in range(min(board.halfmove_clock, len(board.move_stack))):
+            history.pop()
+            keys.append(zobrist_key(history))
+        keys.reverse()
+        return keys
+
+    def _push(self, board: chess.Board, move: chess.Move) -> None:
+        """
+        Play a move, updating position keys.
+
+        :param chess.Board board: Position.
+        :param chess.Move move: Move to play.
+        """
+        self.keys.append(push(board, move, self.keys[-1]))
+
+    def _pop(self, board: chess.Board) -> None:
+        """
+        Take back a move played by :meth:`_push`.
+
+        :param chess.Board board: Position.
+        """
+        board.pop()
+        self.keys.pop()
+
+    def _root_moves(self, board: chess.Board) -> list[chess.Move]:
+        """
+        Generate root moves.
+
+        Moves suggested by the network are searched first. Only moves of
+        limits `searchmoves` are kept, if any is legal.
+
+        :param chess.Board board: Root position.
+        :return list[chess.Move]: Ordered legal moves.
+        """
+        moves: list[chess.Move] = self._ordered_moves(board, 0, None)
+        if self.limits.searchmoves:
+            allowed: list[chess.Move] = [
+                move for move in moves if move in self.limits.searchmoves
+            ]
+            moves = allowed or moves
+        suggested: list[chess.Move] = self.neural_network.candidate_moves(
+            board, NETWORK_DEPTH, moves=moves
+        )
+        moves.sort(key=lambda move: move not in suggested)
+        return moves
+
+    def _check_stop(self) -> None:
+        """
+        Abort search if a stop condition is reached.
+
+        :raises SearchAborted: If search must stop.
+        """
+        if (
+            (self.stop is not None and self.stop.is_set())
+            or self.nodes >= self.max_nodes
+            or self.time.hard_stop()
+        ):
+            raise SearchAborted()
+
+    def _ordered_moves(
+        self, board: chess.Board, ply: int, first: Optional[chess.Move]
+    ) -> list[chess.Move]:
+        """
+        Generate legal moves, best candidates first.
+
+        Order is first move, captures (MVV-LVA), killers, then quiet moves.
+
+        :param chess.Board board: Position.
+        :param int ply: Distance to root.
+        :param Optional[chess.Move] first: Move to search first.
+        :return list[chess.Move]: Ordered legal moves.
+        """
+        killers: list[chess.Move] = self.killers[ply]
+
+        def key(move: chess.Move) -> int:
+            if move == first:
+                return -100000
+            if board.is_capture(move):
+                victim: Optional[chess.PieceType] = board.piece_type_at(
+                    move.to_square
+                )
+                attacker: chess.PieceType = board.piece_type_at(
+                    move.from_square
+                )  # type: ignore
+                return -10 * PIECES_VALUES[
+                    victim or chess.PAWN
+                ] + PIECES_VALUES[attacker] // 100 - 10000
+            if move.promotion:
+                return -9000
+            if move in killers:
+                return -5000
+            return 0
+
+        return sorted(board.legal_moves, key=key)
+
+    def _root(
+        self,
+        board: chess.Board,
+        moves: list[chess.Move],
+        depth: int,
+        *,
+        store: bool = True,
+    ) -> int:
+        """
+        Search root moves.
+
+        :param chess.Board board: Root position.
+        :param list[chess.Move] moves: Ordered root moves.
+        :param int depth: Search depth.
+        :param bool store: Store result in transposition table, which is
+            wrong when some root moves are excluded.
+        :return int: Best score.
+        """
+        alpha: int = -MATE_SCORE
+        beta: int = MATE_SCORE
+        self.pv[0] = []
+        self.root_score = alpha
+        for index, move in enumerate(moves):
+            self._push(board, move)
+            try:
+                if index == 0:
+                    score: int = -self._pvs(board, depth - 1, -beta, -alpha, 1)
+                else:
+                    score = -self._pvs(board, depth - 1, -alpha - 1, -alpha, 1)
+                    if score > alpha:
+                        score = -self._pvs(board, depth - 1, -beta, -alpha, 1)
+            finally:
+                self._pop(board)
+            if score > alpha:
+                alpha = self.root_score = score
+                self.pv[0] = [move, *self.pv[1]]
+        if store:
+            self.transpositions.store(
+                self.keys[-1], pack_move(self.pv[0][0]), alpha, depth, EXACT
+            )
+        return alpha
+
+    def _pvs(
+        self, board: chess.Board, depth: int, alpha: int, beta: int, ply: int
+    ) -> int:
+        """
+        Principal variation search.
+
+        :param chess.Board board: Position.
+        :param int depth: Remaining depth.
+        :param int alpha: Lower bound.
+        :param int beta: Upper bound.
+        :param int ply: Distance to root.
+        :return int: Score from side to move point of view.
+        """
+        self.pv[ply] = []
+        if depth <= 0 or ply >= MAX_DEPTH:
+            return self._quiescence(board, alpha, beta, ply)
+        self.nodes += 1
+        if not self.nodes & CHECK_NODES or self.nodes >= self.max_nodes:
+            self._check_stop()
+        if board.is_fifty_moves() or board.is_insufficient_material():
+            return 0
+        key: int = self.keys[-1]
+        if board.halfmove_clock >= 4 and key in self.keys[
+            -board.halfmove_clock - 1 : -1
+        ]:
+            return 0
+        first: Optional[chess.Move] = None
+        entry: Optional[tuple[int, int, int, int]] = self.transpositions.probe(
+            key
+        )
+        if entry is not None:
+            packed_move, table_score, table_depth, bound = entry
+            first = unpack_move(packed_move)
+            table_score = score_from_table(table_score, ply)
+            if table_depth >= depth and beta - alpha == 1:
+                if (
+                    bound == EXACT
+                    or (bound == LOWER and table_score >= beta)
+                    or (bound == UPPER and table_score <= alpha)
+                ):
+                    return table_score
+        if first is None and ply < len(self.previous_pv):
+            first = self.previous_pv[ply]
+        moves: list[chess.Move] = self._ordered_moves(board, ply, first)
+        if not moves:
+            return -MATE_SCORE + ply if board.is_check() else 0
+        original_alpha: int = alpha
+        best_move: Optional[chess.Move] = None
+        for index, move in enumerate(moves):
+            quiet: bool = not board.is_capture(move)
+            self._push(board, move)
+            try:
+                if index == 0:
+                    score: int = -self._pvs(
+                        board, depth - 1, -beta, -alpha, ply + 1
+                    )
+                else:
+                    score = -self._pvs(
+                        board, depth - 1, -alpha - 1, -alpha, ply + 1
+                    )
+                    if alpha < score < beta:
+                        score = -self._pvs(
+                            board, depth - 1, -beta, -alpha, ply + 1
+                        )
+            finally:
+                self._pop(board)
+            if score >= beta:
+                if quiet and move not in self.killers[ply]:
+                    self.killers[ply] = [move, *self.killers[ply][:1]]
+                self.transpositions.store(
+                    key,
+                    pack_move(move),
+                    score_to_table(score, ply),
+                    depth,
+                    LOWER,
+                )
+                return score
+            if score > alpha:
+                alpha = score
+                best_move = move
+                self.pv[ply] = [move, *self.pv[ply + 1]]
+        self.transpositions.store(
+            key,
+            pack_move(best_move),
+            score_to_table(alpha, ply),
+            depth,
+            EXACT if alpha > original_alpha else UPPER,
+        )
+        return alpha
+
+    def _quiescence(
+        self, board: chess.Board, alpha: int, beta: int, ply: int
+    ) -> int:
+        """
+        Search captures only, until position is quiet.
+
+        In check, all evasions are searched instead, without standing pat,
+        so that mates are found.
+
+        :param chess.Board board: Position.
+        :param int alpha: Lower bound.
+        :param int beta: Upper bound.
+        :param int ply: Distance to root.
+        :return int: Score from side to move point of view.
+        """
+        self.nodes += 1
+        if not self.nodes & CHECK_NODES or self.nodes >= self.max_nodes:
+            self._check_stop()
+        moves: list[chess.Move]
+        if board.is_check():
+            moves = self._ordered_moves(board, ply, None)
+            if not moves:
+                return -MATE_SCORE + ply
+            if ply >= MAX_DEPTH:
+                return evaluate(board)
+        else:
+            stand_pat: int = evaluate(board)
+            if stand_pat >= beta or ply >= MAX_DEPTH:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+            moves = sorted(
+                board.generate_legal_captures(),
+                key=lambda move: -PIECES_VALUES[
+                    board.piece_type_at(move.to_square) or chess.PAWN
+                ],
+            )
+        for move in moves:
+            board.push(move)
+            try:
+                score: int = -self._quiescence(board, -beta, -alpha, ply + 1)
+            finally:
+                board.pop()
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+Transposition table.
+"""
+from typing import Optional
+
+import chess
+import numpy as np
+
+ENTRY_DTYPE: np.dtype = np.dtype(
+    [
+        ("check", np.uint64),
+        ("move", np.uint16),
+        ("score", np.int16),
+        ("depth", np.uint8),
+        ("bound", np.uint8),
+        ("age", np.uint8),
+        ("padding", np.uint8),
+    ]
+)
+"""
+A table entry, 16 bytes.
+
+`check` is the position key XORed with the other 8 bytes read as an integer,
+so that entries half written by another process are detected and ignored.
+"""
+BUCKET_SIZE: int = 2
+"""Entries per bucket: a depth-preferred slot and an always-replace slot."""
+EMPTY: int = 0
+"""Bound of an unused entry."""
+EXACT: int = 1
+"""Bound of an exact score."""
+LOWER: int = 2
+"""Bound of a score that is a lower bound (fail high)."""
+UPPER: int = 3
+"""Bound of a score that is an upper bound (fail low)."""
+
+
+def table_size(size: int) -> int:
+    """
+    Compute table size in bytes.
+
+    :param int size: Table size in megabytes.
+    :return int: Size of a whole number of buckets, in bytes.
+    """
+    bucket: int = ENTRY_DTYPE.itemsize * BUCKET_SIZE
+    return max(size * 1024 * 1024 // bucket, 1) * bucket
+
+
+def pack_data(move: int, score: int, depth: int, bound: int, age: int) -> int:
+    """
+    Pack entry data in the integer layout of :data:`ENTRY_DTYPE`.
+
+    Layout is the one of little-endian hosts.
+
+    :param int move: Packed move.
+    :param int score: Score.
+    :param int depth: Searched depth.
+    :param int bound: Score bound.
+    :param int age: Search age.
+    :return int: Entry data.
+    """
+    return (
+        move
+        | (score & 0xFFFF) << 16
+        | depth << 32
+        | bound << 40
+        | age << 48
+    )
+
+
+def pack_move(move: Optional[chess.Move]) -> int:
+    """
+    Pack a move in 16 bits.
+
+    :param Optional[chess.Move] move: Move to pack.
+    :return int: Packed move, 0 for no move.
+    """
+    if move is None:
+        return 0
+    return (
+        move.from_square | move.to_square << 6 | (move.promotion or 0) << 12
+    )
+
+
+def unpack_move(packed: int) -> Optional[chess.Move]:
+    """
+    Unpack a move packed by :func:`pack_move`.
+
+    :param int packed: Packed move.
+    :return Optional[chess.Move]: Move, None for no move.
+    """
+    if not packed:
+        return None
+    return chess.Move(
+        packed & 63, packed >> 6 & 63, (packed >> 12) or None
+    )
+
+
+class TranspositionTable:
+    """
+    Fixed-size transposition table.
+
+    Entries are stored in a NumPy structured array of buckets. Each bucket
+    has a depth-preferred slot and an always-replace slot.
+
+    The table can be placed in a shared buffer and used by several
+    processes at once without locks: each entry is written as two 64 bits
+    words, and checked on read with :data:`ENTRY_DTYPE` `check` field.
+    """
+
+    def __init__(self, size: int, buffer: Optional[memoryview] = None) -> None:
+        """
+        Allocate table.
+
+        :param int size: Table size in megabytes.
+        :param Optional[memoryview] buffer: Memory to use, of at least
+            :func:`table_size` bytes, allocated if None.
+        """
+        self.table: np.ndarray = np.zeros((0, BUCKET_SIZE), dtype=ENTRY_DTYPE)
+        """Buckets of entries."""
+        self.words: np.ndarray = np.zeros((0, BUCKET_SIZE, 2), dtype=np.uint64)
+        """Same buckets, as check and data words."""
+        self.age: int = 0
+        """Current search age, older entries are replaced first."""
+        self.resize(size, buffer)
+
+    def resize(self, size: int, buffer: Optional[memoryview] = None) -> None:
+        """
+        Reallocate table, clearing it.
+
+        :param int size: Table size in megabytes.
+        :param Optional[memoryview] buffer: Memory to use, allocated if None.
+        """
+        buckets: int = table_size(size) // (
+            ENTRY_DTYPE.itemsize * BUCKET_SIZE
+        )
+        if buffer is None:
+            self.table = np.zeros((buckets, BUCKET_SIZE), dtype=ENTRY_DTYPE)
+        else:
+            self.table = np.ndarray(
+                (buckets, BUCKET_SIZE), dtype=ENTRY_DTYPE, buffer=buffer
+            )
+        self.words = self.table.view(np.uint64).reshape(
+            buckets, BUCKET_SIZE, 2
+        )
+
+    def clear(self) -> None:
+        """
+        Clear all entries.
+
+        Called on new games.
+        """
+        self.table.fill(0)
+        self.age = 0
+
+    def new_search(self) -> None:
+        """
+        Increase age.
+
+        Called at each new search.
+        """
+        self.age = (self.age + 1) & 0xFF
+
+    def probe(self, key: int) -> Optional[tuple[int, int, int, int]]:
+        """
+        Find a position entry.
+
+        :param int key: Position Zobrist key.
+        :return Optional[tuple[int, int, int, int]]: Packed move, score,
+            depth and bound, None if not found.
+        """
+        for check, data in self.words[key % len(self.words)].tolist():
+            if check ^ data == key and data >> 40 & 0xFF != EMPTY:
+                score: int = data >> 16 & 0xFFFF
+                return (
+                    data & 0xFFFF,
+                    score - 0x10000 if score & 0x8000 else score,
+                    data >> 32 & 0xFF,
+                    data >> 40 & 0xFF,
+                )
+        return None
+
+    def store(
+        self, key: int, move: int, score: int, depth: int, bound: int
+    ) -> None:
+        """
+        Store a position entry.
+
+        The depth-preferred slot is replaced by deeper, same position or
+        older entries, else the always-replace slot is used.
+
+        :param int key: Position Zobrist key.
+        :param int move: Packed best move.
+        :param int score: Score.
+        :param int depth: Searched depth.
+        :param int bound: Score bound.
+        """
+        bucket: np.ndarray = self.words[key % len(self.words)]
+        entries: list[list[int]] = bucket.tolist()
+        check, data = entries[0]
+        slot: int = 1
+        if (
+            data >> 40 & 0xFF == EMPTY
+            or check ^ data == key
+            or data >> 48 & 0xFF != self.age
+            or depth >= data >> 32 & 0xFF
+        ):
+            slot = 0
+        check, data = entries[slot]
+        if not move and check ^ data == key:
+            move = data & 0xFFFF  # keep known best move
+        data = pack_data(move, score, depth, bound, self.age)
+        bucket[slot] = (key ^ data, data)
+
+    def hashfull(self) -> int:
+        """
+        Estimate table usage.
+
+        :return int: Permill of entries used in current search.
+        """
+        sample: np.ndarray = self.table[: 1000 // BUCKET_SIZE]
+        used: int = np.count_nonzero(
+            (sample["bound"] != EMPTY) & (sample["age"] == self.age)
+        )
+        return used * 1000 // sample.size
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+Incremental Zobrist keys.
+
+Keys are the same as :func:`chess.polyglot.zobrist_hash`, but are updated
+move by move instead of being computed from scratch.
+"""
+import chess
+import chess.polyglot
+
+RANDOM: list[int] = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+"""Polyglot random numbers."""
+
+
+def zobrist_key(board: chess.Board) -> int:
+    """
+    Compute the key of a position from scratch.
+
+    :param chess.Board board: Position.
+    :return int: Polyglot Zobrist key.
+    """
+    return chess.polyglot.zobrist_hash(board)
+
+
+def _piece_key(
+    piece_type: chess.PieceType, color: chess.Color, square: chess.Square
+) -> int:
+    """
+    Key of a piece on a square.
+
+    :param chess.PieceType piece_type: Piece type.
+    :param chess.Color color: Piece color.
+    :param chess.Square square: Piece square.
+    :return int: Key part.
+    """
+    return RANDOM[64 * ((piece_type - 1) * 2 + color) + square]
+
+
+def _state_key(board: chess.Board) -> int:
+    """
+    Key of castling rights, en passant file and turn.
+
+    :param chess.Board board: Position.
+    :return int: Key part.
+    """
+    key: int = 0
+    castling: int = board.castling_rights
+    if castling & chess.BB_H1:
+        key ^= RANDOM[768]
+    if castling & chess.BB_A1:
+        key ^= RANDOM[769]
+    if castling & chess.BB_H8:
+        key ^= RANDOM[770]
+    if castling & chess.BB_A8:
+        key ^= RANDOM[771]
+    if board.ep_square:
+        if board.turn == chess.WHITE:
+            ep_mask: int = chess.shift_down(chess.BB_SQUARES[board.ep_square])
+        else:
+            ep_mask = chess.shift_up(chess.BB_SQUARES[board.ep_square])
+        ep_mask = chess.shift_left(ep_mask) | chess.shift_right(ep_mask)
+        if ep_mask & board.pawns & board.occupied_co[board.turn]:
+            key ^= RANDOM[772 + chess.square_file(board.ep_square)]
+    if board.turn == chess.WHITE:
+        key ^= RANDOM[780]
+    return key
+
+
+def push(board: chess.Board, move: chess.Move, key: int) -> int:
+    """
+    Play a move and update position key.
+
+    :param chess.Board board: Position, modified in place.
+    :param chess.Move move: Legal move to play.
+    :param int key: Key of the position before the move.
+    :return int: Key of the position after the move.
+    """
+    key ^= _state_key(board)
+    color: chess.Color = board.turn
+    piece_type: chess.PieceType = board.piece_type_at(
+        move.from_square
+    )  # type: ignore
+    if piece_type == chess.KING and board.is_castling(move):
+        rank: int = chess.square_rank(move.from_square)
+        kingside: bool = chess.square_file(move.to_square) > chess.square_file(
+            move.from_square
+        )
+        key ^= _piece_key(chess.KING, color, move.from_square)
+        key ^= _piece_key(
+            chess.KING, color, chess.square(6 if kingside else 2, rank)
+        )
+        key ^= _piece_key(
+            chess.ROOK, color, chess.square(7 if kingside else 0, rank)
+        )
+        key ^= _piece_key(
+            chess.ROOK, color, chess.square(5 if kingside else 3, rank)
+        )
+    else:
+        key ^= _piece_key(piece_type, color, move.from_square)
+        if board.is_en_passant(move):
+            key ^= _piece_key(
+                chess.PAWN, not color, move.to_square + (-8 if color else 8)
+            )
+        else:
+            captured: chess.PieceType | None = board.piece_type_at(
+                move.to_square
+            )
+            if captured:
+                key ^= _piece_key(captured, not color, move.to_square)
+        key ^= _piece_key(move.promotion or piece_type, color, move.to_square)
+    board.push(move)
+    return key ^ _state_key(board)
@@ -7,7 +7,7 @@ Neural network object.
 """
 import copy
 import random
-from typing import Callable, Self, Iterator, TypeVar
+from typing import Callable, Self, Iterator, Optional, TypeVar
 
 import chess
 import numpy as np
@@ -30,6 +30,9 @@ PIECES_VALUES: dict[chess.PieceType, int] = {
     chess.KING: 5,
 }
 
+CODE_WEIGHTS: np.ndarray = 1 << np.arange(14)
+"""Weights of output line bits in move codes."""
+
 NeuralNetworkType = TypeVar("NeuralNetworkType", bound="NeuralNetwork")
 """Neural network type annotation."""
 
@@ -279,67 +282,106 @@ class NeuralNetwork:
         )
         return output_layer
 
+    def candidate_moves(
+        self,
+        board: chess.Board,
+        depth: int,
+        *,
+        disable_correction: bool = False,
+        moves: Optional[list[chess.Move]] = None,
+    ) -> list[chess.Move]:
+        """
+        Get all the moves suggested by the network in a position.
+
+        Used by the engine search for move ordering.
+
+        :param chess.Board board: Actual position.
+        :param int depth: Search depth.
+        :param bool disable_correction: Disable correction.
+        :param Optional[list[chess.Move]] moves: Allowed moves, all legal
+            moves if None.
+        :return list[chess.Move]: Legal moves suggested by the network.
+        """
+        input_layer: np.ndarray = self.generate_inputs(board)
+        last_hidden_layer: np.ndarray = self.calculate(
+            input_layer, depth, disable_correction=disable_correction
+        )
+        return self.good_moves(board, last_hidden_layer, moves)
+
+    @staticmethod
+    def legality_table(moves: list[chess.Move]) -> np.ndarray:
+        """
+        Build the table of output line codes to moves.
+
+        Codes are output lines read as 14 bits integers: from rank, to rank,
+        from file, to file (3 bits each) and promotion (2 bits, piece type
+        minus one). Promotion bits are ignored for other moves. As queen
+        can't be encoded, promotion bits 0 (pawn) stand for queen.
+
+        :param list[chess.Move] moves: Allowed moves.
+        :return np.ndarray: Index in moves of each code, -1 if not allowed.
+        """
+        table: np.ndarray = np.full(1 << 14, -1, dtype=np.int16)
+        for index, move in enumerate(moves):
+            code: int = (
+                chess.square_rank(move.from_square)
+                | chess.square_rank(move.to_square) << 3
+                | chess.square_file(move.from_square) << 6
+                | chess.square_file(move.to_square) << 9
+            )
+            if move.promotion is None:
+                table[code::1 << 12] = index
+            elif move.promotion == chess.QUEEN:
+                table[code] = index
+            else:
+                table[code | (move.promotion - 1) << 12] = index
+        return table
+
+    def good_moves(
+        self,
+        board: chess.Board,
+        output_layer: np.ndarray,
+        moves: Optional[list[chess.Move]] = None,
+    ) -> list[chess.Move]:
+        """
+        Parse output layer to get good moves.
+
+        Output lines are decoded at once through :meth:`legality_table`,
+        illegal or not allowed moves are dropped.
+
+        :param chess.Board board: Current position.
+        :param np.ndarray output_layer: Output layer from the NN.
+        :param Optional[list[chess.Move]] moves: Allowed moves, all legal
+            moves if None.
+        :return list[chess.Move]: Legal moves in output layer (unordered).
+        """
+        allowed: list[chess.Move] = (
+            list(board.legal_moves) if moves is None else moves
+        )
+        codes: np.ndarray = (output_layer[:, :14] > 127) @ CODE_WEIGHTS
+        indexes: np.ndarray = self.legality_table(allowed)[codes]
+        return [allowed[index] for index in indexes[indexes >= 0]]
+
     def output(
-        self, board: chess.Board, output_layer: np.ndarray
+        self,
+        board: chess.Board,
+        output_layer: np.ndarray,
+        moves: Optional[list[chess.Move]] = None,
     ) -> chess.Move:
         """
         Parse output layer to get best move.
 
         :param chess.Board board: Current position.
         :param np.ndarray output_layer: Output layer from the NN.
+        :param Optional[list[chess.Move]] moves: Allowed moves, all legal
+            moves if None.
         :return chess.Move: Good moves in the position (unordered).
         """
-        legal_moves: list[chess.Move] = list(board.legal_moves)
-        piece_map: dict[chess.Square, chess.Piece] = board.piece_map()
-
-        def parse_move(line: np.ndarray) -> chess.Move:
-            bool3_to_int: Callable[[np.ndarray], int] = (
-                lambda a: (1 if a[0] else 0)
-                + (2 if a[1] else 0)
-                + (4 if a[2] else 0)
-            )
-            bool2_to_int: Callable[[np.ndarray], int] = lambda a: (
-                1 if a[0] else 0
-            ) + (2 if a[1] else 0)
-            from_rank: int = bool3_to_int(line[0:3])
-            to_rank: int = bool3_to_int(line[3:6])
-            from_file: int = bool3_to_int(line[6:9])
-            to_file: int = bool3_to_int(line[9:12])
-            promotion: int = chess.PieceType(bool2_to_int(line[12:14]) + 1)
-            return chess.Move(
-                chess.square(from_file, from_rank),
-                chess.square(to_file, to_rank),
-                promotion=promotion,
-            )
-
-        def is_legal(move: chess.Move) -> bool:
-            for legal_move in legal_moves:
-                if (
-                    legal_move.from_square == move.from_square
-                    and legal_move.to_square == move.to_square
-                ):
-                    if (
-                        piece_map[legal_move.from_square].piece_type
-                        == chess.PAWN
-                        and chess.square_rank(legal_move.to_square)
-                        in (
-                            0,
-                            7,
-                        )
-                        and move in legal_moves
-                    ):
-                        return True
-                    else:
-                        move.promotion = None
-                        return True
-            return False
-
-        output: np.ndarray = output_layer > 127
-        good_moves: list[chess.Move] = []
-        for line in output:
-            move: chess.Move = parse_move(line)
-            if is_legal(move):
-                good_moves.append(move)
+        good_moves: list[chess.Move] = self.good_moves(
+            board, output_layer, moves
+        )
         if good_moves:
             return random.choice(good_moves)
-        return random.choice(legal_moves)
+        return random.choice(
+            list(board.legal_moves) if moves is None else moves
+        )
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+Compiled polyglot book index.
+
+A polyglot `.bin` book is loaded once in NumPy arrays: sorted unique keys,
+entry offsets of each key, raw moves and cumulative weights. The index is
+saved next to the book and reused while the book is unchanged. Lookups are
+a searchsorted on keys, and bulk weighted draws a searchsorted on cumulative
+weights.
+"""
+import os
+from typing import Optional, Self
+
+import chess
+import chess.polyglot
+import numpy as np
+
+POLYGLOT_DTYPE: np.dtype = np.dtype(
+    [("key", ">u8"), ("move", ">u2"), ("weight", ">u2"), ("learn", ">u4")]
+)
+"""A polyglot book entry, as stored in `.bin` files."""
+INDEX_SUFFIX: str = ".index.npz"
+"""Suffix added to book path to get its index path."""
+
+
+def decode_move(board: chess.Board, raw_move: int) -> chess.Move:
+    """
+    Decode a polyglot move.
+
+    Polyglot castling moves are king takes rook, they are converted to
+    standard king moves.
+
+    :param chess.Board board: Position the move is played in.
+    :param int raw_move: Polyglot move.
+    :return chess.Move: Move.
+    """
+    to_square: int = raw_move & 0x3F
+    from_square: int = raw_move >> 6 & 0x3F
+    promotion: int = raw_move >> 12 & 0x7
+    if (
+        not board.chess960
+        and board.kings & chess.BB_SQUARES[from_square]
+        and board.rooks
+        & board.occupied_co[board.turn]
+        & chess.BB_SQUARES[to_square]
+    ):
+        to_square = chess.square(
+            6 if to_square > from_square else 2,
+            chess.square_rank(from_square),
+        )
+    return chess.Move(
+        from_square, to_square, promotion + 1 if promotion else None
+    )
+
+
+class BookIndex:
+    """Compiled polyglot book."""
+
+    def __init__(
+        self,
+        keys: np.ndarray,
+        offsets: np.ndarray,
+        moves: np.ndarray,
+        cumulative: np.ndarray,
+    ) -> None:
+        """
+        Initialize index from compiled arrays.
+
+        Use :meth:`open` to get the index of a book.
+
+        :param np.ndarray keys: Sorted unique Zobrist keys.
+        :param np.ndarray offsets: First entry of each key, followed by the
+            number of entries.
+        :param np.ndarray moves: Raw polyglot move of each entry.
+        :param np.ndarray cumulative: Cumulative sum of entries weights.
+        """
+        self.keys: np.ndarray = keys
+        """Sorted unique Zobrist keys."""
+        self.offsets: np.ndarray = offsets
+        """First entry of each key, followed by the number of entries."""
+        self.moves: np.ndarray = moves
+        """Raw polyglot move of each entry."""
+        self.cumulative: np.ndarray = cumulative
+        """Cumulative sum of entries weights."""
+
+    @classmethod
+    def compile(cls, book_path: str) -> Self:
+        """
+        Compile a polyglot book.
+
+        Entries of weight 0 are dropped.
+
+        :param str book_path: Path to book BIN file.
+        :return Self: Book index.
+        """
+        entries: np.ndarray = np.fromfile(book_path, dtype=POLYGLOT_DTYPE)
+        entries = entries[entries["weight"] > 0]
+        entries = entries[np.argsort(entries["key"], kind="stable")]
+        keys, starts = np.unique(entries["key"], return_index=True)
+        return cls(
+            keys.astype(np.uint64),
+            np.append(starts, len(entries)).astype(np.int64),
+            entries["move"].astype(np.uint16),
+            np.cumsum(entries["weight"], dtype=np.uint64),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> Self:
+        """
+        Load a compiled index.
+
+        :param str path: Index path.
+        :return Self: Book index.
+        """
+        with np.load(path) as arrays:
+            return cls(
+                arrays["keys"],
+                arrays["offsets"],
+                arrays["moves"],
+                arrays["cumulative"],
+            )
+
+    def save(self, path: str) -> None:
+        """
+        Save compiled index.
+
+        The index is renamed into place once written, so that an interrupted
+        save never leaves a partial index.
+
+        :param str path: Index path.
+        """
+        with open(path + ".tmp", "wb") as file:
+            np.savez(
+                file,
+                keys=self.keys,
+                offsets=self.offsets,
+                moves=self.moves,
+                cumulative=self.cumulative,
+            )
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def open(cls, book_path: str) -> Self:
+        """
+        Get index of a book.
+
+        Saved index is used if it is newer than the book, else the book is
+        compiled and its index saved.
+
+        :param str book_path: Path to book BIN file.
+        :return Self: Book index.
+        """
+        index_path: str = book_path + INDEX_SUFFIX
+        if os.path.exists(index_path) and os.path.getmtime(
+            index_path
+        ) >= os.path.getmtime(book_path):
+            return cls.load(index_path)
+        index: Self = cls.compile(book_path)
+        try:
+            index.save(index_path)
+        except OSError:
+            pass  # Read-only book directory, compile each time
+        return index
+
+    def __len__(self) -> int:
+        """
+        Get number of positions.
+
+        :return int: Number of keys in book.
+        """
+        return len(self.keys)
+
+    def find(self, key: int) -> Optional[tuple[int, int]]:
+        """
+        Find entries of a position.
+
+        :param int key: Position Zobrist key.
+        :return Optional[tuple[int, int]]: First and after last entries
+            indexes, None if position isn't in book.
+        """
+        index: int = int(np.searchsorted(self.keys, np.uint64(key)))
+        if index == len(self.keys) or self.keys[index] != key:
+            return None
+        return int(self.offsets[index]), int(self.offsets[index + 1])
+
+    def entries(self, board: chess.Board) -> list[tuple[chess.Move, int]]:
+        """
+        Get book moves of a position.
+
+        :param chess.Board board: Position.
+        :return list[tuple[chess.Move, int]]: Legal book moves and weights.
+        """
+        found: Optional[tuple[int, int]] = self.find(
+            chess.polyglot.zobrist_hash(board)
+        )
+        if found is None:
+            return []
+        start, end = found
+        weights: np.ndarray = np.diff(
+            self.cumulative[start:end],
+            prepend=self.cumulative[start - 1] if start else np.uint64(0),
+        )
+        moves: list[tuple[chess.Move, int]] = []
+        for raw_move, weight in zip(
+            self.moves[start:end].tolist(), weights.tolist()
+        ):
+            move: chess.Move = decode_move(board, raw_move)
+            if board.is_legal(move):
+                moves.append((move, weight))
+        return moves
+
+    def choose(
+        self, keys: np.ndarray, generator: np.random.Generator
+    ) -> np.ndarray:
+        """
+        Draw book moves of many positions, weighted by entries weights.
+
+        :param np.ndarray keys: Positions Zobrist keys.
+        :param np.random.Generator generator: Random generator.
+        :return np.ndarray: Raw polyglot moves, 0 for positions not in book.
+        """
+        keys = np.asarray(keys, dtype=np.uint64)
+        if not len(self.keys):
+            return np.zeros(len(keys), dtype=np.uint16)
+        indexes: np.ndarray = np.searchsorted(self.keys, keys)
+        indexes = np.minimum(indexes, len(self.keys) - 1)
+        found: np.ndarray = self.keys[indexes] == keys
+        starts: np.ndarray = self.offsets[indexes]
+        ends: np.ndarray = self.offsets[indexes + 1]
+        before: np.ndarray = np.where(
+            starts > 0, self.cumulative[np.maximum(starts - 1, 0)], 0
+        )
+        totals: np.ndarray = self.cumulative[ends - 1] - before
+        draws: np.ndarray = before + (
+            generator.random(len(keys)) * totals
+        ).astype(np.uint64)
+        entries: np.ndarray = np.searchsorted(
+            self.cumulative, draws, side="right"
+        )
+        return np.where(
+            found, self.moves[np.minimum(entries, len(self.moves) - 1)], 0
+        )
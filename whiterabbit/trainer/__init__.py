@@ -17,15 +17,26 @@ import numpy as np
 
 from ..neural_network import NeuralNetwork
 from .cli import TrainerCLI
-from .config import DEPTHS, NETWORKS_INDEXES_PLAYING, RANDOM_MAXIMUM
+from .config import (
+    DEPTHS,
+    NETWORKS_INDEXES_PLAYING,
+    POSITIONS_SAMPLE,
+    PROFILE_PATH,
+    PROFILE_STAGES,
+    RANDOM_MAXIMUM,
+)
 from .functions import (
     func_core_play_game,
     func_play_game,
     gen_direction_matrices,
     gen_mutated_network,
 )
+from .games import GameWriter, func_save_game
 from .lock import func_acquire_lock
-from .stats import func_update_stats
+from .positions import PositionPool
+from .profiling import Profiler, profile_call
+from .stats import Series, StatsPlotter, func_update_stats
+from .store import GameStore, TimingsStore, func_record_game
 
 NetworkID: TypeAlias = int
 """A network hash."""
@@ -39,11 +50,13 @@ NetworkSource: TypeAlias = Union[
 class Trainer:
     """Main class for training."""
 
-    def __init__(self):
+    def __init__(self, profile: bool = False):
         """
         Initialize training.
 
         TODO: Complete doc.
+
+        :param bool profile: Wether to profile first iteration.
         """
         self.cli: TrainerCLI = TrainerCLI()
         """CLI object."""
@@ -69,19 +82,47 @@ class Trainer:
             "Mutation": 0,
             "First": 0,
         }
-        self.stats_graph: dict[str, list[float]] = {
-            "med": [],
-            "mea": [],
-            "ete": [],
+        self.stats_graph: dict[str, Series] = {
+            "med": Series(),
+            "mea": Series(),
+            "ete": Series(),
         }
+        self.profiler: Profiler = Profiler(PROFILE_STAGES)
+        """Training stages timings."""
+        self.profile: bool = profile
+        """Wether to profile first iteration."""
+        self.plotter: StatsPlotter = StatsPlotter(
+            self.stats_graph, profiler=self.profiler
+        )
+        """Background statistics plotter."""
 
         # Lock file
         self.lock: FileLock = FileLock("data/training/training.lock")
 
+        # Games recording
+        self.iteration: int = 0
+        """Current training iteration."""
+        self.games: GameWriter = GameWriter()
+        """Training games PGN writer."""
+        self.store: GameStore = GameStore()
+        """Training games records."""
+        self.timings: TimingsStore = TimingsStore()
+        """Training iterations stages timings."""
+
+        # Starting positions
+        self.pool: PositionPool = PositionPool()
+        """Starting positions pool."""
+        self.generator: np.random.Generator = np.random.default_rng()
+        """Random generator of starting positions."""
+        self.positions: list[tuple[int, str]] = []
+        """Current iteration starting positions indexes and FENs."""
+
     generate_direction_matrices: Callable = gen_direction_matrices
     generate_mutated_network: Callable = gen_mutated_network
     play_game: Callable = func_play_game
     core_play_game: Callable = func_core_play_game
+    save_game: Callable = func_save_game
+    record_game: Callable = func_record_game
 
     acquire_lock: Callable = func_acquire_lock
 
@@ -161,26 +202,34 @@ class Trainer:
         """
         Training main loop.
 
-        Call this to start training.
+        Call this to start training. Games, timings and graph are written
+        however training ends.
         """
-        training_iterations: int = 0
-
         infos: str = (
             f"({len(NETWORKS_INDEXES_PLAYING)} networks playing, "
-            + f"{len(DEPTHS)} depths)"
+            + f"{len(DEPTHS)} depths, "
+            + f"{len(self.pool) or 'default'} positions)"
         )
         self.cli.print(
             f"[bold cyan]Starting training session [not bold]{infos}"
         )
 
         self.acquire_lock()
+        self.games.start()
+        self.plotter.start()
 
         try:
             while True:
-                training_iterations += 1
-                self.cli.training_iteration(training_iterations)
+                self.iteration += 1
+                self.cli.training_iteration(self.iteration)
 
-                self.train()
+                if self.iteration == 1 and self.profile:
+                    path: str = profile_call(self.train, PROFILE_PATH)
+                    self.cli.print(
+                        f"[bold yellow]Saved profile [not bold]{path}"
+                    )
+                else:
+                    self.train()
 
                 self.update_stats()
 
@@ -190,7 +239,7 @@ class Trainer:
             previous_winner_id: NetworkID = hash(self.previous_winner)
             self.cli.print(
                 "[bold cyan]Ending training session "
-                + f"[not bold]({training_iterations} iterations)"
+                + f"[not bold]({self.iteration} iterations)"
             )
             self.cli.print("[bold yellow]Statistics:")
             self._save_stats()
@@ -216,6 +265,11 @@ class Trainer:
             self.cli.clear()
             self.lock.release()
             sys.exit(0)
+        finally:  # Whatever ended training, keep recorded games
+            self.games.close()
+            self.store.flush()
+            self.timings.flush()
+            self.plotter.close()
 
     def train(self) -> None:
         """
@@ -223,8 +277,10 @@ class Trainer:
 
         Calls all subfunctions.
         """
-        self.generate_direction_matrices()
-        self.generate_networks()
+        self.positions = self.pool.sample(POSITIONS_SAMPLE, self.generator)
+        with self.profiler.stage("network_gen"):
+            self.generate_direction_matrices()
+            self.generate_networks()
         self.game_loop()
         self.fetch_results()
 
@@ -291,7 +347,8 @@ class Trainer:
         for mutated_network in self.mutated_networks:
             if hash(mutated_network) == best_network_id:
                 best_network = mutated_network
-        best_network.save("data/training/best-network.npz")
+        with self.profiler.stage("checkpointing"):
+            best_network.save("data/training/best-network.npz")
         self.first_network = best_network
         colors: dict[NetworkSource, str] = {
             "Random": "red",
@@ -4,9 +4,11 @@ White Rabbit Chess Engine.
 
 Start training.
 """
+import sys
+
 from . import Trainer
 
 
 if __name__ == "__main__":
-    trainer: Trainer = Trainer()
+    trainer: Trainer = Trainer(profile="--profile" in sys.argv[1:])
     trainer.main_loop()
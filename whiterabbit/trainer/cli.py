@@ -8,7 +8,8 @@ from typing import Any
 
 from rich import progress
 
-from .config import DEPTHS, NETWORKS_INDEXES_PLAYING, POSITIONS
+from .config import DEPTHS, NETWORKS_INDEXES_PLAYING, POSITIONS_SAMPLE
+from .profiling import STAGES
 
 
 class TrainerCLI:
@@ -46,7 +47,7 @@ class TrainerCLI:
             total=len(NETWORKS_INDEXES_PLAYING)
             * (len(NETWORKS_INDEXES_PLAYING) - 1)
             * len(DEPTHS)
-            * len(POSITIONS),
+            * POSITIONS_SAMPLE,
         )
 
     def _games_progress(self) -> progress.TaskID:
@@ -61,7 +62,8 @@ class TrainerCLI:
 
     def _depth_progress(self) -> progress.TaskID:
         return self.progress.add_task(
-            "[bold blue] Testing networks", total=len(DEPTHS) * len(POSITIONS)
+            "[bold blue] Testing networks",
+            total=len(DEPTHS) * POSITIONS_SAMPLE,
         )
 
     def _generate_networks_progress(self) -> progress.TaskID:
@@ -183,6 +185,22 @@ class TrainerCLI:
         """
         self.progress.remove_task(self.depth_progress)
 
+    def timings(self, timings: dict[str, float]) -> None:
+        """
+        Print an iteration stages timings.
+
+        :param dict[str, float] timings: Time spent per stage, in seconds.
+        """
+        total: float = sum(timings.values()) or 1.0
+        self.progress.console.print(
+            "[cyan] • Timings [not bold]"
+            + " / ".join(
+                f"{STAGES[stage]} {seconds:.2f}s "
+                + f"({seconds / total * 100:.0f}%)"
+                for stage, seconds in timings.items()
+            )
+        )
+
     def print(self, text: str) -> None:
         """
         Print some text in console.
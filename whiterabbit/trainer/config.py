@@ -33,5 +33,17 @@ POSITIONS: list[str] = [
     "7q/6K1/8/8/8/8/1R6/7k w - - 0 1",
     "8/8/8/8/2k2r2/4K3/8/8 w - - 0 1",
 """
+POSITIONS_SAMPLE: int = 5  # Starting positions per iteration
+POOL_PATH: str = "data/training/positions.npy"
 RANDOM_MAXIMUM: int = 8
 DIR_PROB: tuple[float, float] = (0.95, 0.05)
+GAMES_PATH: str = "data/games/training.pgn"
+GAMES_MAX_SIZE: int = 16 * 1024 * 1024  # Rotate PGN files after 16 MiB
+GAMES_COMPRESS: bool = False
+STORE_PATH: str = "data/training/games"
+STORE_CHUNK: int = 4096  # Games per stored chunk
+TIMINGS_CHUNK: int = 64  # Iterations timings per stored chunk
+STATS_PLOT_INTERVAL: float = 30.0  # Seconds between two graph redraws
+STATS_PLOT_ITERATIONS: int = 10  # Iterations between two graph redraws
+PROFILE_STAGES: bool = True  # Time training stages each iteration
+PROFILE_PATH: str = "data/training/profile"  # --profile report, no suffix
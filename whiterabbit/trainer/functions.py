@@ -5,10 +5,14 @@ White Rabbit Chess Engine.
 
 Training algorithm functions.
 """
+import time
+from typing import Optional
+
 import chess
 import numpy as np
 
-from .config import DEPTHS, DIR_PROB, POSITIONS
+from .config import DEPTHS, DIR_PROB
+from .profiling import Profiler
 from ..neural_network import HIDDEN_LAYERS, NeuralNetwork
 
 
@@ -142,6 +146,64 @@ def func_play_game(self, first_index: int, second_index: int) -> None:
     self.cli.end_game()
 
 
+def play_game(
+    first_network: NeuralNetwork,
+    second_network: NeuralNetwork,
+    position: str,
+    depth: int,
+    profiler: Optional[Profiler] = None,
+) -> chess.Board:
+    """
+    Play a game between two networks.
+
+    Game is played until it is over, claimable draws included. Networks
+    corrections are reset before and after the game.
+
+    :param NeuralNetwork first_network: White network.
+    :param NeuralNetwork second_network: Black network.
+    :param str position: Starting position FEN.
+    :param int depth: Depth to play at.
+    :param Optional[Profiler] profiler: Times playing stages.
+    :return chess.Board: Finished game.
+    """
+    profiler = profiler or Profiler(False)
+    first_network.new_game()
+    second_network.new_game()
+    game: chess.Board = chess.Board(position)
+    while not game.is_game_over(claim_draw=True):
+        network: NeuralNetwork = (
+            first_network if game.turn is chess.WHITE else second_network
+        )
+        with profiler.stage("input_encoding"):
+            input_layer: np.ndarray = network.generate_inputs(game)
+        with profiler.stage("inference"):
+            output_layer: np.ndarray = network.calculate(input_layer, depth)
+        with profiler.stage("move_decoding"):
+            game.push(network.output(game, output_layer))
+    with profiler.stage("bookkeeping"):
+        first_network.game_end()
+        second_network.game_end()
+    return game
+
+
+def game_points(outcome: chess.Outcome, depth: int) -> tuple[int, int]:
+    """
+    Score a training game.
+
+    A draw gives depth points to each network, a win 3 * depth points to
+    the winner.
+
+    :param chess.Outcome outcome: Game outcome.
+    :param int depth: Depth the game was played at.
+    :return tuple[int, int]: White and Black points.
+    """
+    if outcome.winner is None:
+        return depth * 1, depth * 1
+    if outcome.winner is chess.WHITE:
+        return depth * 3, 0
+    return 0, depth * 3
+
+
 def func_core_play_game(
     self,
     first_network: NeuralNetwork,
@@ -155,30 +217,33 @@ def func_core_play_game(
     :param NeuralNetwork second_network: Second network.
     :param int depth: Depth to play at.
     """
-    for position in POSITIONS:
-        first_network.new_game()
-        second_network.new_game()
-        game: chess.Board = chess.Board(position)
-        while not game.is_game_over(claim_draw=True):
-            if game.turn is chess.WHITE:
-                game.push(first_network.search(game, depth))
-            else:
-                game.push(second_network.search(game, depth))
-        first_network.game_end()
-        second_network.game_end()
-        outcome: chess.Outcome = game.outcome(claim_draw=True)  # type: ignore
-        if outcome.result() == "1/2-1/2":  # Draw, +1*depth to each
-            self.scores[hash(first_network)] = (
-                self.scores.get(hash(first_network), 0) + depth * 1
+    for position_index, position in self.positions:
+        start: float = time.perf_counter()
+        game: chess.Board = play_game(
+            first_network, second_network, position, depth, self.profiler
+        )
+        game_time: float = time.perf_counter() - start
+        with self.profiler.stage("bookkeeping"):
+            self.save_game(
+                game, first_network, second_network, depth, position_index
             )
-            self.scores[hash(second_network)] = (
-                self.scores.get(hash(second_network), 0) + depth * 1
+            outcome: chess.Outcome = game.outcome(  # type: ignore
+                claim_draw=True
             )
-        else:  # Win, +3*depth to winner
-            winner_hash = hash(first_network)
-            if outcome.winner is chess.BLACK:
-                winner_hash = hash(second_network)
-            self.scores[winner_hash] = (
-                self.scores.get(winner_hash, 0) + depth * 3
+            self.record_game(
+                game,
+                outcome,
+                first_network,
+                second_network,
+                depth,
+                position_index,
+                game_time,
             )
-        self.cli.game_iteration()
+            for network, points in zip(
+                (first_network, second_network), game_points(outcome, depth)
+            ):
+                if points:
+                    self.scores[hash(network)] = (
+                        self.scores.get(hash(network), 0) + points
+                    )
+            self.cli.game_iteration()
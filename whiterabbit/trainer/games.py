@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+White Rabbit Chess Engine.
+
+Training games PGN recording.
+"""
+from __future__ import annotations
+
+import datetime
+import gzip
+import os
+import queue
+import threading
+import typing
+from typing import Optional, TextIO
+
+import chess
+import chess.pgn
+
+from .config import GAMES_COMPRESS, GAMES_MAX_SIZE, GAMES_PATH
+
+if typing.TYPE_CHECKING:
+    from . import Trainer
+    from ..neural_network import NeuralNetwork
+
+BATCH_SIZE: int = 64
+"""Maximum amount of games written between two flushes."""
+
+
+class GameWriter:
+    """
+    Buffered PGN sink.
+
+    Games are queued by the training loop and written by a background thread,
+    so recording never waits for the disk.
+    """
+
+    def __init__(
+        self,
+        path: str = GAMES_PATH,
+        max_size: int = GAMES_MAX_SIZE,
+        compress: bool = GAMES_COMPRESS,
+    ) -> None:
+        """
+        Initialize writer.
+
+        This doesn't start the writer thread.
+
+        :param str path: Base path of PGN files, index is added before suffix.
+        :param int max_size: Size in bytes after which a new file is started.
+        :param bool compress: Wether to compress files with gzip or not.
+        """
+        self.path: str = path
+        """Base path of PGN files."""
+        self.max_size: int = max_size
+        """Size in bytes after which a new file is started."""
+        self.compress: bool = compress
+        """Wether to compress files with gzip or not."""
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        """Games waiting to be written."""
+        self.thread: threading.Thread = threading.Thread(
+            target=self._run, name="pgn-writer", daemon=True
+        )
+        """Writer thread."""
+        self.index: int = self._last_index()
+        """Current file index."""
+        self.file: Optional[TextIO] = None
+        """Current file."""
+
+    def _file_path(self, index: int) -> str:
+        """
+        Get path of a file from its index.
+
+        :param int index: File index.
+        :return str: File path.
+        """
+        root, extension = os.path.splitext(self.path)
+        file_path: str = f"{root}-{index:04d}{extension}"
+        if self.compress:
+            file_path += ".gz"
+        return file_path
+
+    def _last_index(self) -> int:
+        """
+        Find index of the last written file.
+
+        :return int: Last file index, 1 if there is none.
+        """
+        index: int = 0
+        while os.path.exists(self._file_path(index + 1)):
+            index += 1
+        return max(index, 1)
+
+    def _open(self) -> TextIO:
+        """
+        Open current file for appending.
+
+        Moves to next index if current file is full.
+
+        :return TextIO: Opened file.
+        """
+        while (
+            os.path.exists(self._file_path(self.index))
+            and os.path.getsize(self._file_path(self.index)) >= self.max_size
+        ):
+            self.index += 1
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if self.compress:
+            return typing.cast(
+                TextIO,
+                gzip.open(self._file_path(self.index), "at", encoding="utf-8"),
+            )
+        return open(self._file_path(self.index), "a", encoding="utf-8")
+
+    def start(self) -> None:
+        """
+        Start writer thread.
+
+        Games written before are kept in queue.
+        """
+        self.thread.start()
+
+    def write(self, game: chess.Board, headers: dict[str, str]) -> None:
+        """
+        Queue a game to write.
+
+        The board must not be modified after this call.
+
+        :param chess.Board game: Finished game.
+        :param dict[str, str] headers: PGN headers.
+        """
+        self.queue.put((game, headers))
+
+    def close(self) -> None:
+        """
+        Write remaining games and stop writer thread.
+
+        Blocks until all queued games are on disk.
+        """
+        self.queue.put(None)
+        if self.thread.is_alive():
+            self.thread.join()
+
+    @staticmethod
+    def _format(game: chess.Board, headers: dict[str, str]) -> str:
+        """
+        Export a game to PGN.
+
+        :param chess.Board game: Finished game.
+        :param dict[str, str] headers: PGN headers.
+        :return str: PGN string.
+        """
+        game_pgn: chess.pgn.Game = chess.pgn.Game.from_board(game)
+        game_pgn.headers["Result"] = game.result(claim_draw=True)
+        for name, value in headers.items():
+            game_pgn.headers[name] = value
+        return str(game_pgn) + "\n\n"
+
+    def _run(self) -> None:
+        """
+        Writer thread main loop.
+
+        Writes games by batches and rotates files.
+        """
+        running: bool = True
+        while running:
+            batch: list[str] = []
+            item = self.queue.get()
+            while item is not None:
+                batch.append(self._format(*item))
+                if len(batch) >= BATCH_SIZE:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            running = item is not None
+            if not batch:
+                continue
+            if self.file is None:
+                self.file = self._open()
+            self.file.write("".join(batch))
+            self.file.flush()
+            if os.path.getsize(self._file_path(self.index)) >= self.max_size:
+                self.file.close()
+                self.file = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def func_save_game(
+    self: Trainer,
+    game: chess.Board,
+    first_network: NeuralNetwork,
+    second_network: NeuralNetwork,
+    depth: int,
+    position: int,
+) -> None:
+    """
+    Record a training game.
+
+    :param chess.Board game: Finished game.
+    :param NeuralNetwork first_network: White network.
+    :param NeuralNetwork second_network: Black network.
+    :param int depth: Depth the game was played at.
+    :param int position: Index of the starting position.
+    """
+    date: datetime.date = datetime.date.today()
+    self.games.write(
+        game,
+        {
+            "Event": "White Rabbit training",
+            "Site": os.uname().nodename,
+            "Date": date.strftime("%Y.%m.%d"),
+            "Round": f"{self.iteration}.{position}",
+            "White": f"White Rabbit #{hash(first_network)}",
+            "Black": f"White Rabbit #{hash(second_network)}",
+            "WhiteTitle": "BOT",
+            "BlackTitle": "BOT",
+            "Depth": str(depth),
+        },
+    )
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+White Rabbit Chess Engine.
+
+Training starting positions.
+
+Positions are generated once into a pool file: random book lines played to
+a given ply, and random endgames of a given material validated by Syzygy
+tables. Each training iteration samples its starting positions from the
+pool, read from disk without loading the whole file.
+"""
+import os
+from typing import Optional
+
+import chess
+import chess.syzygy
+import numpy as np
+
+from .config import POOL_PATH, POSITIONS
+from ..engine.zobrist import push, zobrist_key
+from ..polyglot import BookIndex, decode_move
+
+POSITION_DTYPE: np.dtype = np.dtype(
+    [
+        ("squares", np.uint8, 32),
+        ("turn", np.uint8),
+        ("castling", np.uint8),
+        ("ep", np.uint8),
+    ]
+)
+"""
+A packed position.
+
+Squares hold one piece per nibble, 0 for empty squares, else piece type
+plus 6 for Black pieces. Castling holds one bit per rook corner, A1, H1, A8
+then H8. En passant square is 64 if there is none.
+"""
+CASTLING_SQUARES: tuple[int, ...] = (chess.A1, chess.H1, chess.A8, chess.H8)
+"""Rook corners, in castling bits order."""
+ENDGAME_TRIES: int = 1000
+"""Random placements tried per endgame position before giving up."""
+
+
+def pack_position(board: chess.Board) -> np.ndarray:
+    """
+    Pack a position.
+
+    Move counters aren't kept.
+
+    :param chess.Board board: Position.
+    :return np.ndarray: Packed position, with :data:`POSITION_DTYPE` dtype.
+    """
+    pieces: np.ndarray = np.zeros(64, dtype=np.uint8)
+    for square, piece in board.piece_map().items():
+        pieces[square] = piece.piece_type + (0 if piece.color else 6)
+    record: np.ndarray = np.zeros((), dtype=POSITION_DTYPE)
+    record["squares"] = pieces[0::2] | pieces[1::2] << 4
+    record["turn"] = board.turn
+    record["castling"] = sum(
+        1 << bit
+        for bit, square in enumerate(CASTLING_SQUARES)
+        if board.castling_rights & chess.BB_SQUARES[square]
+    )
+    record["ep"] = 64 if board.ep_square is None else board.ep_square
+    return record
+
+
+def unpack_position(record: np.ndarray) -> chess.Board:
+    """
+    Unpack a position.
+
+    :param np.ndarray record: Packed position.
+    :return chess.Board: Position.
+    """
+    pieces: np.ndarray = np.empty(64, dtype=np.uint8)
+    pieces[0::2] = record["squares"] & 0x0F
+    pieces[1::2] = record["squares"] >> 4
+    board: chess.Board = chess.Board(None)
+    for square in np.flatnonzero(pieces).tolist():
+        code: int = int(pieces[square])
+        board.set_piece_at(
+            square, chess.Piece((code - 1) % 6 + 1, code <= 6)
+        )
+    board.turn = bool(record["turn"])
+    board.castling_rights = 0
+    for bit, square in enumerate(CASTLING_SQUARES):
+        if int(record["castling"]) >> bit & 1:
+            board.castling_rights |= chess.BB_SQUARES[square]
+    board.ep_square = None if record["ep"] == 64 else int(record["ep"])
+    return board
+
+
+def book_positions(
+    book: BookIndex, count: int, plies: int, generator: np.random.Generator
+) -> list[chess.Board]:
+    """
+    Play random book lines.
+
+    Lines are played together, drawing one book move per line and per ply
+    at once. Lines leaving the book stop there, lines not leaving the
+    starting position are dropped.
+
+    :param BookIndex book: Book.
+    :param int count: Number of lines.
+    :param int plies: Length of lines.
+    :param np.random.Generator generator: Random generator.
+    :return list[chess.Board]: Final positions of lines.
+    """
+    boards: list[chess.Board] = [chess.Board() for _ in range(count)]
+    keys: list[int] = [zobrist_key(board) for board in boards]
+    playing: list[int] = list(range(count))
+    for _ in range(plies):
+        raw_moves: list[int] = book.choose(
+            np.array([keys[line] for line in playing], dtype=np.uint64),
+            generator,
+        ).tolist()
+        still_playing: list[int] = []
+        for line, raw_move in zip(playing, raw_moves):
+            if not raw_move:
+                continue
+            move: chess.Move = decode_move(boards[line], raw_move)
+            if boards[line].is_legal(move):
+                keys[line] = push(boards[line], move, keys[line])
+                still_playing.append(line)
+        playing = still_playing
+    return [board for board in boards if board.move_stack]
+
+
+def parse_material(material: str) -> tuple[list[int], list[int]]:
+    """
+    Parse a material signature.
+
+    :param str material: Material signature such as "KRRvK".
+    :return tuple[list[int], list[int]]: White and Black piece types.
+    :raises ValueError: If the signature is invalid.
+    """
+    sides: list[str] = material.upper().split("V")
+    if len(sides) != 2 or any(side.count("K") != 1 for side in sides):
+        raise ValueError(f"Invalid material signature {material}")
+    white, black = (
+        [chess.PIECE_SYMBOLS.index(symbol.lower()) for symbol in side]
+        for side in sides
+    )
+    return white, black
+
+
+def endgame_positions(
+    tablebase: chess.syzygy.Tablebase,
+    material: str,
+    count: int,
+    generator: np.random.Generator,
+) -> list[chess.Board]:
+    """
+    Generate random endgames.
+
+    Pieces are placed at random, White to move. Only valid positions which
+    aren't over and are found in Syzygy tables are kept.
+
+    :param chess.syzygy.Tablebase tablebase: Syzygy tables.
+    :param str material: Material signature such as "KRRvK".
+    :param int count: Number of positions.
+    :param np.random.Generator generator: Random generator.
+    :return list[chess.Board]: Positions.
+    :raises ValueError: If the signature is invalid, or its table missing.
+    """
+    white, black = parse_material(material)
+    pieces: list[chess.Piece] = [
+        chess.Piece(piece_type, chess.WHITE) for piece_type in white
+    ] + [chess.Piece(piece_type, chess.BLACK) for piece_type in black]
+    positions: list[chess.Board] = []
+    for _ in range(count * ENDGAME_TRIES):
+        if len(positions) == count:
+            break
+        board: chess.Board = chess.Board(None)
+        squares: list[int] = generator.choice(
+            64, len(pieces), replace=False
+        ).tolist()
+        for square, piece in zip(squares, pieces):
+            board.set_piece_at(square, piece)
+        if (
+            not board.is_valid()
+            or board.pawns & chess.BB_BACKRANKS
+            or board.is_game_over()
+        ):
+            continue
+        try:
+            tablebase.probe_wdl(board)
+        except chess.syzygy.MissingTableError as exception:
+            raise ValueError(f"No Syzygy table for {material}") from exception
+        positions.append(board)
+    return positions
+
+
+class PositionPool:
+    """Training starting positions, stored on disk."""
+
+    def __init__(self, path: str = POOL_PATH) -> None:
+        """
+        Open pool.
+
+        The pool file is memory mapped, positions are read when sampled.
+
+        :param str path: Pool path.
+        """
+        self.path: str = path
+        """Pool path."""
+        self.records: Optional[np.ndarray] = None
+        """Packed positions, None if the pool doesn't exist."""
+        if os.path.exists(path):
+            self.records = np.load(path, mmap_mode="r")
+
+    def __len__(self) -> int:
+        """
+        Get number of positions.
+
+        :return int: Number of positions in pool.
+        """
+        return 0 if self.records is None else len(self.records)
+
+    @staticmethod
+    def save(path: str, boards: list[chess.Board]) -> None:
+        """
+        Write a pool.
+
+        :param str path: Pool path.
+        :param list[chess.Board] boards: Positions.
+        """
+        records: np.ndarray = np.empty(len(boards), dtype=POSITION_DTYPE)
+        for index, board in enumerate(boards):
+            records[index] = pack_position(board)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path + ".tmp", "wb") as file:
+            np.save(file, records)
+        os.replace(path + ".tmp", path)
+
+    def sample(
+        self, count: int, generator: np.random.Generator
+    ) -> list[tuple[int, str]]:
+        """
+        Draw starting positions.
+
+        Falls back to :data:`POSITIONS` when the pool is empty. Exactly
+        `count` positions are returned, drawn with replacement only when
+        there are fewer positions than that.
+
+        :param int count: Number of positions.
+        :param np.random.Generator generator: Random generator.
+        :return list[tuple[int, str]]: Positions indexes and FENs.
+        """
+        if self.records is None or not len(self.records):
+            return [
+                (index % len(POSITIONS), POSITIONS[index % len(POSITIONS)])
+                for index in range(count)
+            ]
+        indexes: np.ndarray = np.sort(
+            generator.choice(
+                len(self.records),
+                count,
+                replace=len(self.records) < count,
+            )
+        )
+        return [
+            (index, unpack_position(self.records[index]).fen())
+            for index in indexes.tolist()
+        ]
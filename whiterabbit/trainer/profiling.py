@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+White Rabbit Chess Engine.
+
+Trainer stages timing and profiling.
+"""
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import time
+from typing import Any, Callable, ContextManager
+
+STAGES: dict[str, str] = {
+    "network_gen": "Networks",
+    "input_encoding": "Inputs",
+    "inference": "Inference",
+    "move_decoding": "Moves",
+    "bookkeeping": "Bookkeeping",
+    "plotting": "Plotting",
+    "checkpointing": "Checkpoint",
+}
+"""Timed stages and their titles."""
+DISABLED: ContextManager = contextlib.nullcontext()
+"""Timer of disabled profilers, does nothing."""
+
+
+class StageTimer:
+    """Adds time spent in a `with` block to a stage."""
+
+    __slots__ = ("totals", "stage", "start")
+
+    def __init__(self, totals: dict[str, float], stage: str) -> None:
+        """
+        Initialize timer.
+
+        :param dict[str, float] totals: Time spent per stage, in seconds.
+        :param str stage: Timed stage.
+        """
+        self.totals: dict[str, float] = totals
+        """Time spent per stage, in seconds."""
+        self.stage: str = stage
+        """Timed stage."""
+        self.start: float = 0.0
+        """Time the block was entered."""
+
+    def __enter__(self) -> StageTimer:
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exception: Any) -> None:
+        self.totals[self.stage] += time.perf_counter() - self.start
+
+
+class Profiler:
+    """
+    Per-stage timings of training iterations.
+
+    Stages are timed with `with profiler.stage(name):` blocks. When
+    disabled, blocks use a shared no-op context manager.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        """
+        Initialize profiler.
+
+        :param bool enabled: Wether to time stages or not.
+        """
+        self.enabled: bool = enabled
+        """Wether stages are timed."""
+        self.totals: dict[str, float] = dict.fromkeys(STAGES, 0.0)
+        """Time spent per stage in current iteration, in seconds."""
+        self.timers: dict[str, StageTimer] = {
+            stage: StageTimer(self.totals, stage) for stage in STAGES
+        }
+        """Reused timer of each stage."""
+
+    def stage(self, name: str) -> ContextManager:
+        """
+        Time a stage.
+
+        Stages aren't reentrant: a stage can't be timed inside itself.
+
+        :param str name: Stage, one of :data:`STAGES`.
+        :return ContextManager: Timer.
+        """
+        if not self.enabled:
+            return DISABLED
+        return self.timers[name]
+
+    def reset(self) -> dict[str, float]:
+        """
+        End an iteration.
+
+        :return dict[str, float]: Time spent per stage, in seconds.
+        """
+        totals: dict[str, float] = dict(self.totals)
+        for stage in self.totals:
+            self.totals[stage] = 0.0
+        return totals
+
+
+def profile_call(function: Callable[[], Any], path: str) -> str:
+    """
+    Profile a function call.
+
+    Uses pyinstrument if installed, writing an HTML report, else cProfile,
+    writing stats readable with pstats or snakeviz.
+
+    :param Callable[[], Any] function: Function to profile.
+    :param str path: Report path, without suffix.
+    :return str: Report path.
+    """
+    try:
+        # Imported here as pyinstrument is a dev dependency
+        import pyinstrument  # pylint: disable=C0415
+    except ImportError:
+        profile: cProfile.Profile = cProfile.Profile()
+        try:
+            profile.runcall(function)
+        finally:
+            profile.dump_stats(path + ".prof")
+        return path + ".prof"
+    profiler: pyinstrument.Profiler = pyinstrument.Profiler()
+    profiler.start()
+    try:
+        function()
+    finally:
+        profiler.stop()
+        with open(path + ".html", "w", encoding="utf-8") as file:
+            file.write(profiler.output_html())
+    return path + ".html"
@@ -4,63 +4,207 @@ White Rabbit Chess Engine.
 
 Trainer statistics with matplotlib.
 """
-from statistics import mean, median
+from __future__ import annotations
 
-import matplotlib
-import matplotlib.pyplot as plt
+import threading
+import time
+import typing
 
-matplotlib.use("Agg")
+import numpy as np
 
+from .config import STATS_PLOT_INTERVAL, STATS_PLOT_ITERATIONS
+from .profiling import Profiler
 
-def func_update_stats(self) -> None:
-    """
-    Update stats.
+if typing.TYPE_CHECKING:
+    from . import Trainer
 
-    Uploads beautiful graphics.
-    """
-    # Update values
-    serie: list[int] = []
-    for _, result in self.scores.items():
-        serie.append(result)
+TITLES: dict[str, str] = {"med": "Median", "mea": "Mean", "ete": "Severity"}
+"""Plotted series and their titles."""
 
-    mean_value: float = float(mean(serie))
-    median_value: float = float(median(serie))
-    severity_value: float = float(max(serie) - min(serie))
 
-    self.stats_graph["med"].append(median_value)
-    self.stats_graph["mea"].append(mean_value)
-    self.stats_graph["ete"].append(severity_value)
+class Series:
+    """Growable array of values, doubling its capacity when full."""
 
-    # Plot values
-    plt.figure(figsize=(9, 3))
+    def __init__(self, capacity: int = 256) -> None:
+        """
+        Initialize series.
 
-    plt.subplot(131)
-    plt.plot(range(len(self.stats_graph["med"])), self.stats_graph["med"])
-    """
-    plt.xlabel("Iteration")
-    plt.ylabel("Median")
-    """
-    plt.title("Median")
+        :param int capacity: Initial capacity.
+        """
+        self.data: np.ndarray = np.empty(capacity, dtype=np.float64)
+        """Preallocated values."""
+        self.size: int = 0
+        """Amount of used values."""
 
-    plt.subplot(132)
-    plt.plot(range(len(self.stats_graph["mea"])), self.stats_graph["mea"])
-    """
-    plt.xlabel("Iteration")
-    plt.ylabel("Mean")
-    """
-    plt.title("Mean")
+    def __len__(self) -> int:
+        return self.size
 
-    plt.subplot(133)
-    plt.plot(range(len(self.stats_graph["ete"])), self.stats_graph["ete"])
-    """
-    plt.xlabel("Iteration")
-    plt.ylabel("Severity")
+    def append(self, value: float) -> None:
+        """
+        Add a value.
+
+        :param float value: Value to add.
+        """
+        if self.size == len(self.data):
+            data: np.ndarray = np.empty(2 * len(self.data), dtype=np.float64)
+            data[: self.size] = self.data
+            self.data = data
+        self.data[self.size] = value
+        self.size += 1
+
+    def values(self) -> np.ndarray:
+        """
+        Get used values.
+
+        :return np.ndarray: View of the used values.
+        """
+        return self.data[: self.size]
+
+
+class StatsPlotter:
     """
-    plt.title("Severity")
+    Background statistics plotter.
 
+    Updates are coalesced, and the graph is redrawn once enough iterations
+    are pending or enough time passed since the last redraw.
     """
-    plt.suptitle("Training statistics")
+
+    def __init__(
+        self,
+        series: dict[str, Series],
+        path: str = "data/training/graph.png",
+        interval: float = STATS_PLOT_INTERVAL,
+        iterations: int = STATS_PLOT_ITERATIONS,
+        profiler: typing.Optional[Profiler] = None,
+    ) -> None:
+        """
+        Initialize plotter.
+
+        This doesn't start the plotter thread.
+
+        :param dict[str, Series] series: Series to plot, by key of TITLES.
+        :param str path: Graph image path.
+        :param float interval: Seconds after which pending updates are drawn.
+        :param int iterations: Pending updates after which graph is drawn.
+        :param Optional[Profiler] profiler: Times drawing as "plotting"
+            stage, of the iteration during which it ends.
+        """
+        self.series: dict[str, Series] = series
+        """Series to plot."""
+        self.path: str = path
+        """Graph image path."""
+        self.interval: float = interval
+        """Seconds after which pending updates are drawn."""
+        self.iterations: int = iterations
+        """Pending updates after which graph is drawn."""
+        self.profiler: Profiler = profiler or Profiler(False)
+        """Drawing timer."""
+        self.pending: int = 0
+        """Updates not drawn yet."""
+        self.running: bool = True
+        """Wether the plotter thread should keep running."""
+        self.condition: threading.Condition = threading.Condition()
+        """Guards series, pending and running."""
+        self.thread: threading.Thread = threading.Thread(
+            target=self._run, name="stats-plotter", daemon=True
+        )
+        """Plotter thread."""
+
+    def start(self) -> None:
+        """Start plotter thread."""
+        self.thread.start()
+
+    def append(self, values: dict[str, float]) -> None:
+        """
+        Add a value to each series.
+
+        :param dict[str, float] values: New value by series key.
+        """
+        with self.condition:
+            for key, value in values.items():
+                self.series[key].append(value)
+            self.pending += 1
+            if self.pending >= self.iterations:
+                self.condition.notify()
+
+    def close(self) -> None:
+        """
+        Draw pending updates and stop plotter thread.
+
+        Blocks until the graph is saved.
+        """
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread.is_alive():
+            self.thread.join()
+
+    def _run(self) -> None:
+        """
+        Plotter thread main loop.
+
+        Waits for updates and draws them.
+        """
+        last_draw: float = time.monotonic()
+        while True:
+            with self.condition:
+                while self.running and (
+                    self.pending < self.iterations
+                    and (
+                        not self.pending
+                        or time.monotonic() - last_draw < self.interval
+                    )
+                ):
+                    self.condition.wait(self.interval)
+                running: bool = self.running
+                snapshot: dict[str, np.ndarray] = {}
+                if self.pending:
+                    snapshot = {
+                        key: serie.values().copy()
+                        for key, serie in self.series.items()
+                    }
+                self.pending = 0
+            if snapshot:
+                with self.profiler.stage("plotting"):
+                    self._draw(snapshot)
+                last_draw = time.monotonic()
+            if not running:
+                return
+
+    def _draw(self, snapshot: dict[str, np.ndarray]) -> None:
+        """
+        Draw graph.
+
+        Uploads beautiful graphics.
+
+        :param dict[str, np.ndarray] snapshot: Values of each series.
+        """
+        # Imported here so that matplotlib is only loaded when plotting
+        from matplotlib.figure import Figure  # pylint: disable=C0415
+
+        figure: Figure = Figure(figsize=(9, 3))
+        for axes, (key, title) in zip(figure.subplots(1, 3), TITLES.items()):
+            axes.plot(np.arange(len(snapshot[key])), snapshot[key])
+            axes.set_title(title)
+        figure.savefig(self.path)
+
+
+def func_update_stats(self: Trainer) -> None:
     """
+    Update stats.
 
-    plt.savefig("data/training/graph.png")
-    plt.close()
+    Values are plotted in background by :class:`StatsPlotter`. The
+    iteration stages timings are shown in the CLI and stored.
+    """
+    serie: np.ndarray = np.fromiter(self.scores.values(), dtype=np.float64)
+    self.plotter.append(
+        {
+            "med": float(np.median(serie)),
+            "mea": float(np.mean(serie)),
+            "ete": float(np.ptp(serie)),
+        }
+    )
+    if self.profiler.enabled:
+        timings: dict[str, float] = self.profiler.reset()
+        self.cli.timings(timings)
+        self.timings.append(self.iteration, timings)
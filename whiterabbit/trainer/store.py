@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+White Rabbit Chess Engine.
+
+Columnar stores of training games and stages timings.
+"""
+from __future__ import annotations
+
+import glob
+import os
+import typing
+
+import chess
+import numpy as np
+
+from .config import STORE_CHUNK, STORE_PATH, TIMINGS_CHUNK
+from .profiling import STAGES
+
+if typing.TYPE_CHECKING:
+    from . import Trainer
+    from ..neural_network import NeuralNetwork
+
+GAME_DTYPE: np.dtype = np.dtype(
+    [
+        ("iteration", np.uint32),
+        ("white", np.int64),
+        ("black", np.int64),
+        ("white_source", "U8"),
+        ("black_source", "U8"),
+        ("position", np.uint32),
+        ("depth", np.uint8),
+        ("result", np.int8),
+        ("plies", np.uint16),
+        ("time", np.float32),
+    ]
+)
+"""One row per game. Result is 1 if White won, -1 if Black won, else 0."""
+TIMINGS_DTYPE: np.dtype = np.dtype(
+    [("iteration", np.uint32), *((stage, np.float32) for stage in STAGES)]
+)
+"""One row per iteration, with seconds spent in each stage."""
+
+
+class ChunkStore:
+    """
+    Append-only store of records.
+
+    Rows are buffered in a preallocated structured array and flushed to disk
+    as a new ``.npy`` chunk once it is full.
+    """
+
+    dtype: typing.ClassVar[np.dtype]
+    """Rows dtype."""
+    prefix: typing.ClassVar[str]
+    """Chunks files name prefix."""
+
+    def __init__(self, path: str, chunk_size: int) -> None:
+        """
+        Initialize store.
+
+        :param str path: Directory holding the chunks.
+        :param int chunk_size: Amount of rows per chunk.
+        """
+        self.path: str = path
+        """Directory holding the chunks."""
+        self.buffer: np.ndarray = np.empty(chunk_size, dtype=self.dtype)
+        """Rows waiting to be flushed."""
+        self.size: int = 0
+        """Amount of used rows in buffer."""
+        self.chunk: int = len(self._chunks(path))
+        """Index of the next chunk to write."""
+
+    @classmethod
+    def _chunks(cls, path: str) -> list[str]:
+        """
+        List chunks files in order.
+
+        :param str path: Directory holding the chunks.
+        :return list[str]: Chunks paths.
+        """
+        return sorted(glob.glob(os.path.join(path, f"{cls.prefix}-*.npy")))
+
+    def _append(self, row: tuple) -> None:
+        """
+        Add a row, flushing buffer once full.
+
+        :param tuple row: Row values, in dtype fields order.
+        """
+        self.buffer[self.size] = row
+        self.size += 1
+        if self.size == len(self.buffer):
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write buffered rows as a new chunk.
+
+        The chunk is renamed into place once written, so readers never see a
+        partial file.
+        """
+        if not self.size:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        chunk_path: str = os.path.join(
+            self.path, f"{self.prefix}-{self.chunk:06d}"
+        )
+        with open(chunk_path + ".tmp", "wb") as file:
+            np.save(file, self.buffer[: self.size])
+        os.replace(chunk_path + ".tmp", chunk_path + ".npy")
+        self.chunk += 1
+        self.size = 0
+
+    @classmethod
+    def load(cls, path: str = STORE_PATH) -> np.ndarray:
+        """
+        Load every stored row.
+
+        :param str path: Directory holding the chunks.
+        :return np.ndarray: Rows, with :attr:`dtype` as dtype.
+        """
+        chunks: list[np.ndarray] = [
+            np.load(chunk).astype(cls.dtype) for chunk in cls._chunks(path)
+        ]
+        if not chunks:
+            return np.empty(0, dtype=cls.dtype)
+        return np.concatenate(chunks)
+
+
+class GameStore(ChunkStore):
+    """Append-only store of game records."""
+
+    dtype: typing.ClassVar[np.dtype] = GAME_DTYPE
+    prefix: typing.ClassVar[str] = "chunk"
+
+    def __init__(
+        self, path: str = STORE_PATH, chunk_size: int = STORE_CHUNK
+    ) -> None:
+        """
+        Initialize store.
+
+        :param str path: Directory holding the chunks.
+        :param int chunk_size: Amount of rows per chunk.
+        """
+        super().__init__(path, chunk_size)
+
+    def append(
+        self,
+        iteration: int,
+        networks: tuple[int, int],
+        sources: tuple[str, str],
+        position: int,
+        depth: int,
+        result: int,
+        plies: int,
+        time: float,
+    ) -> None:
+        """
+        Add a game.
+
+        :param int iteration: Training iteration.
+        :param tuple[int, int] networks: White and Black networks hashes.
+        :param tuple[str, str] sources: White and Black networks sources.
+        :param int position: Starting position index in pool.
+        :param int depth: Depth the game was played at.
+        :param int result: 1 if White won, -1 if Black won, else 0.
+        :param int plies: Length of the game.
+        :param float time: Wall time of the game in seconds.
+        """
+        self._append(
+            (
+                iteration,
+                *networks,
+                *sources,
+                position,
+                depth,
+                result,
+                plies,
+                time,
+            )
+        )
+
+
+class TimingsStore(ChunkStore):
+    """Append-only store of training iterations stages timings."""
+
+    dtype: typing.ClassVar[np.dtype] = TIMINGS_DTYPE
+    prefix: typing.ClassVar[str] = "timings"
+
+    def __init__(
+        self, path: str = STORE_PATH, chunk_size: int = TIMINGS_CHUNK
+    ) -> None:
+        """
+        Initialize store.
+
+        :param str path: Directory holding the chunks.
+        :param int chunk_size: Amount of rows per chunk.
+        """
+        super().__init__(path, chunk_size)
+
+    def append(self, iteration: int, timings: dict[str, float]) -> None:
+        """
+        Add an iteration timings.
+
+        :param int iteration: Training iteration.
+        :param dict[str, float] timings: Time spent per stage, in seconds.
+        """
+        self._append((iteration, *(timings[stage] for stage in STAGES)))
+
+
+def results_by(
+    games: np.ndarray, field: str
+) -> dict[typing.Any, np.ndarray]:
+    """
+    Count results grouped by a field.
+
+    Answers questions such as which depths or positions decide games.
+
+    :param np.ndarray games: Games loaded with :meth:`GameStore.load`.
+    :param str field: Field to group by, e.g. "depth" or "position".
+    :return dict[Any, np.ndarray]: White wins, draws and Black wins per value.
+    """
+    values, inverse = np.unique(games[field], return_inverse=True)
+    counts: np.ndarray = np.zeros((len(values), 3), dtype=np.int64)
+    np.add.at(counts, (inverse, 1 - games["result"].astype(np.intp)), 1)
+    return {value.item(): count for value, count in zip(values, counts)}
+
+
+def func_record_game(
+    self: Trainer,
+    game: chess.Board,
+    outcome: chess.Outcome,
+    first_network: NeuralNetwork,
+    second_network: NeuralNetwork,
+    depth: int,
+    position: int,
+    time: float,
+) -> None:
+    """
+    Add a training game to the store.
+
+    :param chess.Board game: Finished game.
+    :param chess.Outcome outcome: Game outcome.
+    :param NeuralNetwork first_network: White network.
+    :param NeuralNetwork second_network: Black network.
+    :param int depth: Depth the game was played at.
+    :param int position: Index of the starting position in pool.
+    :param float time: Wall time of the game in seconds.
+    """
+    result: int = 0
+    if outcome.winner is not None:
+        result = 1 if outcome.winner is chess.WHITE else -1
+    first_id: int = hash(first_network)
+    second_id: int = hash(second_network)
+    self.store.append(
+        self.iteration,
+        (first_id, second_id),
+        (
+            self.networks_sources[first_id],
+            self.networks_sources[second_id],
+        ),
+        position,
+        depth,
+        result,
+        len(game.move_stack),
+        time,
+    )
@@ -7,12 +7,18 @@ UCI main loop.
 """
 import importlib.metadata
 from multiprocessing.managers import BaseManager
+import queue
 import threading
 from typing import Optional
 
 from .commands import Commands
 from .engine import Engine
 
+OUT_OF_BAND: tuple[str, ...] = ("isready", "stop", "ponderhit", "quit")
+"""Commands handled by the reader, not queued behind other commands."""
+READY_TIMEOUT: float = 1.0
+"""Maximum time `isready` waits for queued commands, in seconds."""
+
 
 class UCI:
     """White Rabbit's UCI."""
@@ -28,6 +34,12 @@ class UCI:
         """Shared variables manager."""
         self.commands_parser: Commands = Commands()  # type: ignore
         """Commands parser."""
+        self.queue: queue.Queue[Optional[str]] = queue.Queue()
+        """Commands waiting for execution, None stops executor."""
+        self.executor: threading.Thread = threading.Thread(
+            target=self.execute, name="uci-executor", daemon=True
+        )
+        """Thread running queued commands in order."""
         self.about()
 
     def about(self) -> None:
@@ -45,15 +57,71 @@ class UCI:
         Start UCI;
 
         Runs the mainloop.
+
+        Input is read here and commands are executed in order by
+        :meth:`execute`, so reading never waits for a command. Commands in
+        :data:`OUT_OF_BAND` are run right away, after queued commands are
+        done. `isready` waits at most :data:`READY_TIMEOUT`, `stop` and
+        `ponderhit` never overtake a queued `go`.
         """
+        self.executor.start()
         while True:
-            command_string: str = input()
-            thread: threading.Thread = threading.Thread(
-                target=self.parse, args=[command_string]
+            try:
+                command_string: str = input()
+            except EOFError:
+                command_string = "quit"
+            keyword: str = command_string.strip().split(" ", 1)[0]
+            if keyword not in OUT_OF_BAND:
+                self.queue.put(command_string)
+                continue
+            if keyword == "quit":
+                self.cancel()
+                self.parse(command_string)
+                break
+            self.wait_idle(READY_TIMEOUT if keyword == "isready" else None)
+            self.parse(command_string)
+
+    def execute(self) -> None:
+        """
+        Executor main loop.
+
+        Runs queued commands one by one, until None is received.
+        """
+        while True:
+            command_string: Optional[str] = self.queue.get()
+            try:
+                if command_string is None:
+                    return
+                self.parse(command_string)
+            finally:
+                self.queue.task_done()
+
+    def wait_idle(self, timeout: Optional[float]) -> bool:
+        """
+        Wait until all queued commands are executed.
+
+        :param Optional[float] timeout: Maximum time to wait, in seconds,
+            no limit if None.
+        :return bool: Wether queue is empty, False on timeout.
+        """
+        with self.queue.all_tasks_done:
+            return self.queue.all_tasks_done.wait_for(
+                lambda: not self.queue.unfinished_tasks, timeout
             )
-            thread.start()
-            if command_string == "quit":
+
+    def cancel(self) -> None:
+        """
+        Drop queued commands and stop executor.
+
+        Called on `quit`.
+        """
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
                 break
+            self.queue.task_done()
+        self.queue.put(None)
 
     def parse(self, command: str) -> None:
         """
@@ -86,6 +154,11 @@ class UCI:
             self.commands_parser.ponderhit()
         elif keyword == "quit":
             self.commands_parser.quit()
+        elif (
+            keyword == "whiterabbit.telemetry"
+            and self.commands_parser.debug_mode
+        ):
+            self.commands_parser.telemetry()
         elif keyword == "":
             pass
         else:
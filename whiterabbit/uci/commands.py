@@ -5,12 +5,25 @@ White Rabbit chess engine.
 
 UCI commands parser.
 """
-import sys
-
 import chess
 from .options import ButtonOption, Option
 from .engine import Engine
+from .output import Output, info_lines
 from ..engine.evaluation import Evaluation
+from ..engine.limits import Limits
+
+GO_ARGUMENTS: tuple[str, ...] = (
+    "wtime",
+    "btime",
+    "winc",
+    "binc",
+    "movestogo",
+    "depth",
+    "nodes",
+    "mate",
+    "movetime",
+)
+"""Arguments of `go` command followed by an integer value."""
 
 
 class Commands:
@@ -26,6 +39,12 @@ class Commands:
         """Debug mode status."""
         self.engine: Engine = Engine()
         """Main engine."""
+        self.output: Output = Output(
+            interval=self.engine.options["InfoInterval"].value
+        )
+        """Output writer."""
+        self.engine.on_info = self.info
+        self.engine.on_bestmove = self.bestmove
 
     def send(self, *args: str) -> None:
         """
@@ -33,7 +52,7 @@ class Commands:
 
         :param str args: Message to send.
         """
-        print(*args)
+        self.output.send(" ".join(args))
 
     def uci(self) -> None:
         """
@@ -66,7 +85,9 @@ class Commands:
         UCI `isready` command.
 
         Check if the engine is responding.
+        Starts search process if needed.
         """
+        self.engine.start()
         self.readyok()
 
     def setoption(self, *args: str) -> None:
@@ -81,8 +102,13 @@ class Commands:
             option_name: str = args[1]
             if len(args) > 3 and args[2] == "value":
                 option_value: str = " ".join(args[3:])
-                if option_name in self.engine.options:
-                    self.engine.options[option_name].set(option_value)
+                if (
+                    self.engine.set_option(option_name, option_value)
+                    and option_name == "InfoInterval"
+                ):
+                    self.output.interval = self.engine.options[
+                        option_name
+                    ].value
             else:
                 if isinstance(
                     self.engine.options.get(option_name), ButtonOption
@@ -103,8 +129,7 @@ class Commands:
 
         Start a new game.
         """
-        self.engine.transpositions.clear()
-        self.engine.engine.neural_network.new_game()
+        self.engine.new_game()
 
     def position(self, *args: str) -> None:
         """
@@ -114,17 +139,25 @@ class Commands:
 
         :param str args: Command arguments.
         """
-        if args:
-            if args[0] == "fen" and len(args) > 6:
-                self.engine.position = chess.Board(" ".join(args[1:7]))
-            elif args[0] == "startpos":
-                self.engine.position = chess.Board()
-            else:
+        if args and args[0] == "startpos":
+            fen: str = chess.STARTING_FEN
+            moves_args: tuple[str, ...] = args[1:]
+        elif args and args[0] == "fen" and len(args) > 6:
+            fen = " ".join(args[1:7])
+            moves_args = args[7:]
+        else:
+            return
+        moves: list[chess.Move] = []
+        if moves_args and moves_args[0] == "moves":
+            for move in moves_args[1:]:
                 try:
-                    for move in args:
-                        self.engine.position.push(chess.Move.from_uci(move))
+                    moves.append(chess.Move.from_uci(move))
                 except ValueError:
-                    pass
+                    break
+        try:
+            self.engine.set_position(fen, moves)
+        except ValueError:
+            self.send("info string Invalid FEN")
 
     def uci_go(self, *args: str) -> None:
         """
@@ -136,8 +169,7 @@ class Commands:
         """
         search_moves: list[chess.Move] = []
         skip_count: int = 0  # Skip arguments because they are used
-        move_time: int = 0
-        mode: str = "infinite"
+        limits: Limits = Limits()
         for index, arg in enumerate(args):
             if skip_count == 0:
                 if arg == "searchmoves":
@@ -151,37 +183,52 @@ class Commands:
                                 )
                             )  # Add next arguments
                             skip_count += 1  # Skip argument
-                        except ValueError:  # The value is not a valid UCI
+                        except (ValueError, IndexError):  # Not a valid UCI
                             break
-                elif arg == "movetime":
-                    move_time = int(args[index + 1])
-                    mode = "movetime"
+                elif arg in GO_ARGUMENTS and index + 1 < len(args):
+                    try:
+                        setattr(limits, arg, int(args[index + 1]))
+                    except ValueError:
+                        self.send(f"info string Invalid {arg}")
                     skip_count = 1
+                elif arg == "infinite":
+                    limits.infinite = True
+                elif arg == "ponder":
+                    limits.ponder = True
             else:
                 skip_count -= 1
-        for move in search_moves:
-            self.engine.position.push(move)
-        if mode == "infinite":
-            self.engine.search(max_depth=float("inf"))
-        elif mode == "movetime":
-            print("## MOVETIME", file=sys.stderr)
-            self.engine.search(move_time=move_time)
+        limits.searchmoves = search_moves or None
+        limits.multipv = int(self.engine.options["MultiPV"].value)
+        self.engine.search(limits)
 
     def stop(self) -> None:
         """
         UCI `stop` command.
 
-        Stop engine thread.
+        Stop engine search and send its best move.
+        """
+        result: tuple[
+            chess.Move, chess.Move | None
+        ] | None = self.engine.stop()
+        if result:
+            self.bestmove(*result)
+
+    def ponderhit(self) -> None:
         """
-        self.bestmove(self.engine.stop())
+        UCI `ponderhit` command.
+
+        The opponent played the expected move, pondering search goes on as a
+        normal search.
+        """
+        self.engine.ponderhit()
 
     def quit(self) -> None:
         """
         UCI `quit` command.
 
-        Stop engine thread.
+        Stop engine process.
         """
-        self.engine.stop()
+        self.engine.quit()
 
     def uci_id(self, data: str, value: str) -> None:
         """
@@ -228,40 +275,22 @@ class Commands:
         """
         UCI `info` command.
 
-        Shows engine search status.
+        Shows engine search status. Infos are throttled by output writer.
 
         :param Evaluation info: Data.
         """
-        for multipv, move in enumerate(info.best_moves):
-            if multipv < int(self.engine.options["MultiPV"].value):
-                score: str = f"cp {info.score[0]}"
-                if info.score[1] > 0:
-                    score = f"mate {info.score[1]}"
-                self.send(
-                    "info",
-                    "depth",
-                    str(info.depth),
-                    "seldepth",
-                    str(info.depth),
-                    "time",
-                    str(info.time),
-                    "nodes",
-                    str(info.nodes),
-                    "pv",
-                    move.uci(),
-                    "multipv",
-                    str(multipv + 1),
-                    "score",
-                    score,
-                    "hashfull",
-                    str(info.hash_full),
-                    "nps",
-                    str(info.nps),
-                    "tbhits",
-                    str(info.tbhits),
-                    "cpuload",
-                    str(info.cpuload),
-                )
+        self.output.info(
+            info_lines(info, int(self.engine.options["MultiPV"].value))
+        )
+
+    def telemetry(self) -> None:
+        """
+        Debug `whiterabbit.telemetry` command.
+
+        Shows search counters, latency histogram and CPU load.
+        """
+        for line in self.engine.telemetry.report():
+            self.send("info string", line)
 
     def option(self, option: Option) -> None:
         """
@@ -5,58 +5,462 @@ White Rabbit chess engine.
 
 UCI engine link.
 """
-from multiprocessing import Process
-from typing import Optional
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection, wait
+from multiprocessing.synchronize import Event
+from typing import Callable, Optional
 
 import chess
 
 from whiterabbit import engine
 
-from .options import Option, SpinOption
+from .options import CheckOption, Option, SpinOption
+from .output import INFO_INTERVAL
+from .telemetry import Telemetry
+from ..engine import CONTEXT
 from ..engine.evaluation import Evaluation
+from ..engine.limits import Limits
+from ..engine.transposition import table_size
+
+FAILED: Evaluation = Evaluation(0, 0, 0, [], (0, 0), 0, 0, 0, 0)
+"""Result recorded for a search process which died."""
+
+
+def search_worker(
+    connection: Connection,
+    stop_flag: Event,
+    ponderhit_flag: Event,
+    index: int,
+    hash_name: str,
+    hash_size: int,
+) -> None:
+    """
+    Search process main loop.
+
+    Runs commands received from the UCI process until `quit`.
+
+    Commands are tuples starting with the command name:
+        - ("position", fen, moves): set position from FEN then play moves,
+          or play moves on current position if FEN is None.
+        - ("go", limits): search current position, sends infos and result.
+        - ("newgame",): reset engine for a new game.
+        - ("quit",): exit loop.
+
+    Messages sent are tuples starting with the message name and worker index:
+        - ("info", index, evaluation): a depth was completed.
+        - ("bestmove", index, evaluation): search is done.
+
+    :param Connection connection: Pipe end connected to the UCI process.
+    :param Event stop_flag: Set by the UCI process to stop searching.
+    :param Event ponderhit_flag: Set by the UCI process on ponder hit.
+    :param int index: Worker index, 0 for the main search, helpers else.
+    :param str hash_name: Name of shared transposition table memory.
+    :param int hash_size: Transposition table size in megabytes.
+    """
+    search_engine: engine.Engine = engine.Engine()
+    memory: shared_memory.SharedMemory = shared_memory.SharedMemory(hash_name)
+    search_engine.set_hash(hash_size, memory.buf)
+    position: chess.Board = chess.Board()
+    connection.send(("ready", index))
+    while True:
+        command: tuple = connection.recv()
+        if command[0] == "position":
+            if command[1] is not None:
+                position = chess.Board(command[1])
+            for move in command[2]:
+                position.push(move)
+        elif command[0] == "go":
+            limits: Limits = command[1]
+            evaluation: Evaluation = search_engine.search(
+                position,
+                limits,
+                stop=stop_flag,
+                info=lambda info: connection.send(("info", index, info)),
+                helper=index,
+                ponderhit=ponderhit_flag,
+            )
+            if limits.infinite:
+                stop_flag.wait()  # bestmove is only allowed after stop
+            connection.send(("bestmove", index, evaluation))
+        elif command[0] == "newgame":
+            search_engine.new_game()
+        elif command[0] == "quit":
+            break
+    del search_engine  # releases shared memory buffer
+    memory.close()
 
 
 class Engine:
-    """Engine wrapper for UCI."""
+    """
+    Engine wrapper for UCI.
+
+    Searches run in `Threads` processes sharing a transposition table (lazy
+    SMP). The first process runs the main search, whose limits decide when
+    searching ends, other ones are helpers filling the shared table.
+    """
 
     def __init__(self):
         """
         Initialize engine wrapper.
 
-        Starts shared variables management.
+        Search processes are started by :meth:`start`.
         """
         self.options: dict[str, Option] = {
             "Hash": SpinOption("Hash", 32, 4096, 1),
+            "Threads": SpinOption("Threads", 1, 256, 1),
             "MultiPV": SpinOption("MultiPV", 1, 500, 1),
+            "Ponder": CheckOption("Ponder", False),
+            "InfoInterval": SpinOption(
+                "InfoInterval", INFO_INTERVAL, 10000, 0
+            ),
         }
         """Engine options."""
-        self.transpositions: dict[int, Evaluation] = {}
-        """Transpositions table."""
         self.position: chess.Board = chess.Board()
         """Current position."""
-        self.process: Optional[Process] = None
-        """Current search process."""
-        self.engine: engine.Engine = engine.Engine()
+        self.fen: str = chess.STARTING_FEN
+        """FEN of current position before its moves."""
+        self.moves: list[chess.Move] = []
+        """Moves played from FEN to current position."""
+        self.processes: list[multiprocessing.process.BaseProcess] = []
+        """Search processes, main search first."""
+        self.connections: list[Connection] = []
+        """Pipe ends connected to the search processes."""
+        self.memory: Optional[shared_memory.SharedMemory] = None
+        """Shared transposition table memory."""
+        self.stop_flag: Event = CONTEXT.Event()
+        """Set to stop current search."""
+        self.ponderhit_flag: Event = CONTEXT.Event()
+        """Set when the opponent played the pondered move."""
+        self.listener: Optional[threading.Thread] = None
+        """Thread receiving search results."""
+        self.lock: threading.Lock = threading.Lock()
+        """Guards searching, stopping and result."""
+        self.start_lock: threading.Lock = threading.Lock()
+        """Guards search processes startup."""
+        self.searching: bool = False
+        """Wether a search is running."""
+        self.stopping: bool = False
+        """Wether current search was stopped by :meth:`stop`."""
+        self.pondering: bool = False
+        """Wether current search is pondering, its best move is withheld."""
+        self.result: Optional[tuple[chess.Move, Optional[chess.Move]]] = None
+        """Best move and ponder move of last search."""
+        self.results: dict[int, Evaluation] = {}
+        """Final evaluation of each process in current search."""
+        self.nodes: dict[int, int] = {}
+        """Nodes searched by each process in current search."""
+        self.failed: set[int] = set()
+        """Indexes of search processes which died."""
+        self.reported_depth: int = 0
+        """Deepest depth sent to :attr:`on_info` in current search."""
+        self.done: threading.Event = threading.Event()
+        """Set when current search sent its best move."""
+        self.telemetry: Telemetry = Telemetry()
+        """Search counters, latency and CPU load."""
+        self.on_info: Callable[[Evaluation], None] = lambda info: None
+        """Called with each search info."""
+        self.on_bestmove: Callable[
+            [chess.Move, Optional[chess.Move]], None
+        ] = lambda move, ponder: None
+        """
+        Called with best move and ponder move of searches not stopped by
+        :meth:`stop`, after ponder hit for pondering searches.
+        """
+
+    def start(self) -> None:
+        """
+        Start search processes if not running.
+
+        Blocks until engines are loaded. If a process fails to start, the
+        started ones are terminated and shared memory is released.
+        """
+        with self.start_lock:
+            if self.processes:
+                return
+            hash_size: int = self.options["Hash"].value
+            self.memory = shared_memory.SharedMemory(
+                create=True, size=table_size(hash_size)
+            )
+            try:
+                for index in range(self.options["Threads"].value):
+                    connection, worker_connection = CONTEXT.Pipe()
+                    process: multiprocessing.process.BaseProcess = (
+                        CONTEXT.Process(
+                            target=search_worker,
+                            args=[
+                                worker_connection,
+                                self.stop_flag,
+                                self.ponderhit_flag,
+                                index,
+                                self.memory.name,
+                                hash_size,
+                            ],
+                            daemon=True,
+                        )
+                    )
+                    process.start()
+                    self.processes.append(process)
+                    self.connections.append(connection)
+                for connection in self.connections:
+                    connection.recv()  # ("ready", index)
+                    connection.send(("position", self.fen, self.moves))
+            except BaseException:
+                for process in self.processes:
+                    process.terminate()
+                    process.join()
+                self.processes = []
+                self.connections = []
+                self.memory.close()
+                self.memory.unlink()
+                self.memory = None
+                raise
+            self.failed = set()
+            self.telemetry.watch(
+                [process.pid for process in self.processes]  # type: ignore
+            )
+            self.listener = threading.Thread(
+                target=self._listen,
+                args=[list(self.connections)],
+                name="search-listener",
+                daemon=True,
+            )
+            self.listener.start()
+
+    def _listen(self, connections: list[Connection]) -> None:
+        """
+        Receive messages from search processes.
+
+        Forwards deepest infos and best result to callbacks. A process which
+        died is recorded as failed.
+
+        :param list[Connection] connections: Search processes connections.
+        """
+        indexes: dict[Connection, int] = {
+            connection: index for index, connection in enumerate(connections)
+        }
+        while connections:
+            for connection in wait(connections):
+                try:
+                    message: tuple = connection.recv()  # type: ignore
+                except (EOFError, OSError):
+                    connections.remove(connection)  # type: ignore
+                    with self.start_lock:  # Not stopped by quit
+                        current: bool = connection in self.connections
+                    if current:
+                        self._failed(indexes[connection])  # type: ignore
+                    continue
+                if message[0] == "info":
+                    self._info(message[1], message[2])
+                elif message[0] == "bestmove":
+                    self._bestmove(message[1], message[2])
+
+    def _info(self, index: int, info: Evaluation) -> None:
+        """
+        Handle a search process info.
+
+        Only infos deeper than already reported ones are forwarded, with
+        total nodes and CPU load of all processes. Lines keep main search
+        nodes of each line.
+
+        :param int index: Search process index.
+        :param Evaluation info: Completed depth evaluation.
+        """
+        self.nodes[index] = info.nodes
+        if info.depth <= self.reported_depth:
+            return
+        self.reported_depth = info.depth
+        info.nodes = sum(self.nodes.values())
+        info.nps = info.nodes * 1000 // max(info.time, 1)
+        self.telemetry.info(info)
+        self.on_info(info)
+
+    def _failed(self, index: int) -> None:
+        """
+        Handle a search process death.
+
+        An empty result is recorded for it, so that current search still
+        ends. Search processes are restarted before next search.
+
+        :param int index: Search process index.
+        """
+        with self.lock:
+            self.failed.add(index)
+            searching: bool = self.searching and index not in self.results
+        if searching:
+            self._bestmove(index, FAILED)
+
+    def _bestmove(self, index: int, evaluation: Evaluation) -> None:
+        """
+        Handle a search process result.
 
-    def search(self, **kwargs) -> None:
+        Helpers are stopped when the main search is done. Once all processes
+        are done, the deepest result is chosen, main search first. Ponder
+        move is the second move of its principal variation.
+
+        :param int index: Search process index.
+        :param Evaluation evaluation: Final evaluation.
+        """
+        self.results[index] = evaluation
+        if index == 0:
+            self.stop_flag.set()
+        if len(self.results) < len(self.processes):
+            return
+        best: Evaluation = max(
+            self.results.values(),
+            key=lambda result: (bool(result.best_moves), result.depth),
+        )  # max returns first maximum, main search is first
+        move: chess.Move = (
+            best.best_moves[0] if best.best_moves else chess.Move.null()
+        )
+        ponder: Optional[chess.Move] = best.pv[1] if len(best.pv) > 1 else None
+        self.telemetry.bestmove(
+            sum(result.nodes for result in self.results.values())
+        )
+        with self.lock:
+            self.searching = False
+            self.result = (move, ponder)
+            send: bool = not self.stopping and not self.pondering
+            self.done.set()
+        if send:
+            self.on_bestmove(move, ponder)
+
+    def set_option(self, name: str, value: str) -> bool:
+        """
+        Set an option value.
+
+        Search processes are restarted when options they use change.
+
+        :param str name: Option name.
+        :param str value: New option value.
+        :return bool: Wether the value was accepted or not.
+        """
+        if name not in self.options or not self.options[name].set(value):
+            return False
+        if name in ("Hash", "Threads"):
+            self.quit()
+        return True
+
+    def set_position(self, fen: str, moves: list[chess.Move]) -> None:
+        """
+        Set current position.
+
+        GUIs send the whole game before each search: when FEN is unchanged
+        and moves extend previous ones, only new moves are played, here and
+        in search processes. Moves are played until an illegal one.
+
+        :param str fen: FEN of position before moves.
+        :param list[chess.Move] moves: Moves played from FEN.
+        :raises ValueError: If FEN is invalid.
+        """
+        update: Optional[str] = None  # FEN sent to search processes
+        if fen != self.fen or moves[: len(self.moves)] != self.moves:
+            self.position = chess.Board(fen)
+            self.fen = update = fen
+            self.moves = []
+        new_moves: list[chess.Move] = []
+        for move in moves[len(self.moves) :]:
+            if not self.position.is_legal(move):
+                break
+            self.position.push(move)
+            new_moves.append(move)
+        self.moves.extend(new_moves)
+        if update is None and not new_moves:
+            return
+        with self.start_lock:
+            for connection in self.connections:
+                connection.send(("position", update, new_moves))
+
+    def new_game(self) -> None:
+        """
+        Start a new game.
+
+        Resets search processes state.
+        """
+        self.start()
+        for connection in self.connections:
+            connection.send(("newgame",))
+
+    def search(self, limits: Limits) -> None:
         """
         Starts searching.
 
-        Starts a process for engine search.
+        Search runs in search processes, results are sent to callbacks.
+
+        Search processes are restarted if one died.
+
+        :param Limits limits: Search limits.
         """
         self.stop()
-        self.process = Process(
-            target=self.engine.search,
-            args=[self.position, self.options],
-            kwargs=kwargs,
-        )
-        self.process.start()
+        if self.failed:
+            self.quit()
+        self.start()
+        with self.lock:
+            self.results = {}
+            self.nodes = {}
+            self.searching = True
+            self.stopping = False
+            self.pondering = limits.ponder
+            self.done.clear()
+        self.ponderhit_flag.clear()
+        self.reported_depth = 0
+        self.telemetry.search_start()
+        self.stop_flag.clear()
+        for connection in self.connections:
+            connection.send(("go", limits))
+
+    def ponderhit(self) -> None:
+        """
+        Opponent played the pondered move.
 
-    def stop(self) -> None:
+        Current search continues as a timed search, or its best move is sent
+        if it is already done.
         """
-        Stop search process if running.
+        with self.lock:
+            if not self.pondering:
+                return
+            self.pondering = False
+            done: bool = not self.searching
+        self.ponderhit_flag.set()
+        if done and self.result is not None:
+            self.on_bestmove(*self.result)
+
+    def stop(self) -> Optional[tuple[chess.Move, Optional[chess.Move]]]:
+        """
+        Stop current search.
+
+        Blocks until the search processes return their results.
+
+        :return Optional[tuple[chess.Move, Optional[chess.Move]]]: Best move
+            and ponder move, None if no search was running.
+        """
+        with self.lock:
+            pondering: bool = self.pondering
+            self.pondering = False
+            if not self.searching:
+                return self.result if pondering else None
+            self.stopping = True
+        self.stop_flag.set()
+        self.done.wait()
+        return self.result
+
+    def quit(self) -> None:
+        """
+        Stop search processes.
 
         Should be runned when command `quit` received.
         """
-        if isinstance(self.process, Process):
-            self.process.kill()
+        self.stop()
+        with self.start_lock:
+            for process, connection in zip(self.processes, self.connections):
+                if process.is_alive():
+                    connection.send(("quit",))
+            for process in self.processes:
+                process.join()
+            self.processes = []
+            self.connections = []
+            if self.memory is not None:
+                self.memory.close()
+                self.memory.unlink()
+                self.memory = None
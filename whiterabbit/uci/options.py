@@ -145,7 +145,7 @@ class SpinOption(Option):
         if not value.isnumeric():
             return False
         int_value: int = int(value)
-        if self.max_value > int_value > self.min_value:
+        if self.max_value >= int_value >= self.min_value:
             self.value = int_value
             return True
         return False
@@ -154,11 +154,11 @@ class SpinOption(Option):
         """
         Return default value as string.
 
-        Should be `true`or `false`.
+        Followed by min and max values.
 
         :return str: Current value.
         """
-        return str(self.default)
+        return f"{self.default} min {self.min_value} max {self.max_value}"
 
 
 class ComboOption(Option):
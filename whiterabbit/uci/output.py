@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+UCI output writer.
+"""
+import sys
+import threading
+import time
+from typing import Optional, TextIO
+
+from ..engine.evaluation import Evaluation
+
+INFO_INTERVAL: int = 100
+"""Minimum time between two info batches, in milliseconds."""
+INFO_TEMPLATE: str = (
+    "info depth {depth} seldepth {depth} time {time} nodes {nodes} "
+    "pv {pv} multipv {multipv} score {score} hashfull {hash_full} "
+    "nps {nps} tbhits {tbhits} cpuload {cpuload}\n"
+)
+"""Template of an info line."""
+
+
+def info_lines(info: Evaluation, multi_pv: int) -> str:
+    """
+    Format info lines of an evaluation.
+
+    :param Evaluation info: Evaluation.
+    :param int multi_pv: Maximum number of lines.
+    :return str: One line per evaluation line, up to multi_pv.
+    """
+    return "".join(
+        INFO_TEMPLATE.format(
+            depth=line.depth,
+            time=info.time,
+            nodes=line.nodes,
+            pv=" ".join(pv_move.uci() for pv_move in line.pv),
+            multipv=multipv + 1,
+            score=(
+                f"mate {line.score[1]}"
+                if line.score[1]
+                else f"cp {line.score[0]}"
+            ),
+            hash_full=info.hash_full,
+            nps=info.nps,
+            tbhits=info.tbhits,
+            cpuload=info.cpuload,
+        )
+        for multipv, line in enumerate(info.lines[:multi_pv])
+    )
+
+
+class Output:
+    """
+    Buffered UCI output.
+
+    Lines are written and flushed at once. Infos are throttled: only the
+    last batch received during :attr:`interval` is written, when interval
+    expires or before next line.
+    """
+
+    def __init__(
+        self, stream: Optional[TextIO] = None, interval: int = INFO_INTERVAL
+    ) -> None:
+        """
+        Initialize writer.
+
+        :param Optional[TextIO] stream: Output stream, stdout if None.
+        :param int interval: Minimum time between info batches, in
+            milliseconds.
+        """
+        self.stream: TextIO = stream or sys.stdout
+        """Output stream."""
+        self.interval: int = interval
+        """Minimum time between info batches, in milliseconds."""
+        self.pending: str = ""
+        """Throttled info lines."""
+        self.last_info: float = 0.0
+        """Time of last info batch written."""
+        self.condition: threading.Condition = threading.Condition()
+        """Guards stream and pending infos, notified on new pending infos."""
+        self.thread: Optional[threading.Thread] = None
+        """Thread writing throttled infos."""
+
+    def send(self, line: str) -> None:
+        """
+        Write a line and flush immediately.
+
+        Pending infos are written first.
+
+        :param str line: Line to write, without newline.
+        """
+        with self.condition:
+            self._write(self.pending + line + "\n")
+            self.pending = ""
+
+    def info(self, lines: str) -> None:
+        """
+        Write info lines, throttled.
+
+        :param str lines: Info lines, newline terminated.
+        """
+        with self.condition:
+            if time.monotonic() - self.last_info >= self.interval / 1000:
+                self._write(lines)
+                self.pending = ""
+                self.last_info = time.monotonic()
+                return
+            self.pending = lines
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self._flush_pending, name="uci-output", daemon=True
+                )
+                self.thread.start()
+            self.condition.notify()
+
+    def _write(self, text: str) -> None:
+        """
+        Write text in a single call and flush.
+
+        Must be called with :attr:`condition` held.
+
+        :param str text: Text to write.
+        """
+        self.stream.write(text)
+        self.stream.flush()
+
+    def _flush_pending(self) -> None:
+        """
+        Throttled infos thread main loop.
+
+        Writes pending infos once interval expired.
+        """
+        with self.condition:
+            while True:
+                self.condition.wait_for(lambda: bool(self.pending))
+                delay: float = (
+                    self.last_info + self.interval / 1000 - time.monotonic()
+                )
+                if delay > 0:
+                    self.condition.wait(delay)
+                    continue
+                self._write(self.pending)
+                self.pending = ""
+                self.last_info = time.monotonic()
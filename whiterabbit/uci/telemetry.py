@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+White Rabbit chess engine.
+
+UCI search telemetry.
+"""
+import bisect
+import collections
+import threading
+import time
+from typing import Optional
+
+import psutil
+
+from ..engine.evaluation import Evaluation
+
+LATENCY_BUCKETS: tuple[int, ...] = (
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+    5000,
+    10000,
+)
+"""Upper bounds of latency histogram buckets, in milliseconds."""
+LATENCY_WINDOW: int = 256
+"""Number of last searches in latency histogram."""
+
+
+class Telemetry:
+    """
+    Search counters, latency and CPU load.
+
+    Counters are kept for current search and since start. Latency is the
+    time from `go` to best move, over the last :data:`LATENCY_WINDOW`
+    searches. CPU load is measured over search processes.
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        """
+        Initialize telemetry.
+
+        :param int window: Number of last searches in latency histogram.
+        """
+        self.lock: threading.Lock = threading.Lock()
+        """Guards counters and latencies."""
+        self.processes: list[psutil.Process] = []
+        """Search processes whose CPU usage is measured."""
+        self.latencies: collections.deque[float] = collections.deque(
+            maxlen=window
+        )
+        """Time to best move of last searches, in milliseconds."""
+        self.start: Optional[float] = None
+        """Start time of current search, None if no search is running."""
+        self.start_cpu: float = 0.0
+        """CPU time of search processes at current search start."""
+        self.searches: int = 0
+        """Number of searches since start."""
+        self.total_nodes: int = 0
+        """Nodes searched since start."""
+        self.total_time: float = 0.0
+        """Time spent searching since start, in milliseconds."""
+        self.nodes: int = 0
+        """Nodes searched by current or last search."""
+        self.depth: int = 0
+        """Depth reached by current or last search."""
+        self.infos: int = 0
+        """Infos received in current or last search."""
+        self.cpuload: int = 0
+        """CPU load of current or last search, in permill."""
+
+    def watch(self, pids: list[int]) -> None:
+        """
+        Set search processes.
+
+        :param list[int] pids: Search processes IDs.
+        """
+        processes: list[psutil.Process] = []
+        for pid in pids:
+            try:
+                processes.append(psutil.Process(pid))
+            except psutil.Error:
+                continue
+        with self.lock:
+            self.processes = processes
+
+    def _cpu_time(self) -> float:
+        """
+        Measure CPU time used by search processes.
+
+        :return float: User and system time, in seconds.
+        """
+        cpu_time: float = 0.0
+        for process in self.processes:
+            try:
+                times = process.cpu_times()
+            except psutil.Error:
+                continue
+            cpu_time += times.user + times.system
+        return cpu_time
+
+    def _cpu_load(self) -> int:
+        """
+        Measure CPU usage of search processes since search start.
+
+        :return int: Permill of all CPUs used.
+        """
+        if self.start is None:
+            return 0
+        elapsed: float = time.monotonic() - self.start
+        used: float = self._cpu_time() - self.start_cpu
+        return min(
+            int(used * 1000 / max(elapsed, 1e-3) / (psutil.cpu_count() or 1)),
+            1000,
+        )
+
+    def search_start(self) -> None:
+        """Start counting a search."""
+        start_cpu: float = self._cpu_time()
+        with self.lock:
+            self.start = time.monotonic()
+            self.start_cpu = start_cpu
+            self.nodes = 0
+            self.depth = 0
+            self.infos = 0
+            self.cpuload = 0
+
+    def info(self, info: Evaluation) -> None:
+        """
+        Count a search info.
+
+        Fills info CPU load.
+
+        :param Evaluation info: Info sent to the GUI.
+        """
+        cpuload: int = self._cpu_load()
+        with self.lock:
+            self.nodes = info.nodes
+            self.depth = max(self.depth, info.depth)
+            self.infos += 1
+            self.cpuload = info.cpuload = cpuload
+
+    def bestmove(self, nodes: int) -> None:
+        """
+        End counting a search.
+
+        :param int nodes: Nodes searched by all search processes.
+        """
+        cpuload: int = self._cpu_load()
+        with self.lock:
+            if self.start is None:
+                return
+            self.cpuload = cpuload
+            latency: float = (time.monotonic() - self.start) * 1000
+            self.start = None
+            self.nodes = nodes
+            self.searches += 1
+            self.total_nodes += nodes
+            self.total_time += latency
+            self.latencies.append(latency)
+
+    def histogram(self) -> list[int]:
+        """
+        Count last searches latencies per bucket.
+
+        :return list[int]: Number of searches per bucket of
+            :data:`LATENCY_BUCKETS`, then over last bucket.
+        """
+        counts: list[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        with self.lock:
+            for latency in self.latencies:
+                counts[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        return counts
+
+    def report(self) -> list[str]:
+        """
+        Describe telemetry.
+
+        :return list[str]: Report lines.
+        """
+        counts: list[int] = self.histogram()
+        with self.lock:
+            latencies: list[float] = sorted(self.latencies)
+            nps: int = int(self.total_nodes * 1000 // max(self.total_time, 1))
+            lines: list[str] = [
+                f"searches {self.searches} nodes {self.total_nodes} "
+                + f"nps {nps}",
+                f"last search nodes {self.nodes} depth {self.depth} "
+                + f"infos {self.infos} cpuload {self.cpuload}",
+            ]
+        if latencies:
+            lines.append(
+                f"latency p50 {latencies[len(latencies) // 2]:.0f} "
+                + f"p90 {latencies[len(latencies) * 9 // 10]:.0f} "
+                + f"max {latencies[-1]:.0f}"
+            )
+        bounds: list[str] = [f"<={bound}" for bound in LATENCY_BUCKETS]
+        bounds.append(f">{LATENCY_BUCKETS[-1]}")
+        lines.append(
+            "latency histogram "
+            + " ".join(
+                f"{bound}:{count}" for bound, count in zip(bounds, counts)
+            )
+        )
+        return lines